@@ -1,48 +1,85 @@
 # type: ignore
 # pylint: skip-file
-from .aggregates import Aggregate, AggregateRoot
+from .aggregates import Aggregate, AggregateRoot, EventSourcedAggregateRoot, UnitOfWork
+from .codecs import BinaryEventCodec, EventCodec, JsonEventCodec
 from .cqrs import (
+    BatchQueryHandler,
+    CachingQueryBus,
     Command,
     CommandBus,
     CommandHandler,
     OptionalResponse,
+    PartitionedCommandBus,
     Query,
     QueryBus,
     QueryHandler,
     Response,
     SimpleCommandBus,
     SimpleQueryBus,
+    query_key,
 )
 from .errors import (
+    AggregateVersionConflictError,
     BadRequestError,
     BaseError,
+    CommandAlreadyRegisteredError,
+    CommandNotDispatchedError,
     CommandNotRegisteredError,
     ConflictError,
     DateTimeInvalidError,
+    EventMapperAlreadyRegisteredError,
     EventMapperNotFoundError,
+    EventNotHandledError,
     EventNotPublishedError,
+    EventStoreCorruptedError,
     ForbiddenError,
     IdInvalidError,
     NotFoundError,
+    QueryAlreadyRegisteredError,
     QueryNotRegisteredError,
     TimestampInvalidError,
     UnauthorizedError,
     UnknownError,
 )
+from .event_stores import (
+    EventStore,
+    FileEventStore,
+    FileSnapshotStore,
+    InMemorySnapshotStore,
+    PickleSnapshotSerializer,
+    SnapshotPolicy,
+    SnapshotSerializer,
+    SnapshotStore,
+    SnapshottingEventStore,
+)
 from .events import (
+    BufferedEventPublisher,
     ConfigEventMappers,
     Event,
     EventBus,
     EventHandler,
     EventMapper,
     EventMapperNotFoundError,
+    EventMetaFactory,
     EventPublisher,
     EventPublishers,
     InternalEventPublisher,
+    MonotonicIdGenerator,
+    ProcessPoolEventBus,
+    QueueEventBus,
     SimpleEventBus,
     find_event_mapper_by_name,
     find_event_mapper_by_type,
+    generate_uuid4_id,
+    milliseconds_clock,
+    nanoseconds_clock,
+    seconds_clock,
+    set_event_meta_factory,
+    slotted,
 )
+from .metrics import DEFAULT_BUCKETS, HandlerMetrics
+from .middlewares import Middleware, Next, compose_middlewares
+from .offload import ThreadOffload, blocking
 from .subprocess import SubprocessResult, run_subprocess  # nosec
 from .utils import (
     env,
@@ -62,17 +99,27 @@ __all__ = (
     # aggregates
     'Aggregate',
     'AggregateRoot',
+    'EventSourcedAggregateRoot',
+    'UnitOfWork',
+    # codecs
+    'EventCodec',
+    'JsonEventCodec',
+    'BinaryEventCodec',
     # cqrs
     'Command',
     'CommandHandler',
     'CommandBus',
     'SimpleCommandBus',
+    'PartitionedCommandBus',
     'Query',
     'Response',
     'OptionalResponse',
     'QueryHandler',
+    'BatchQueryHandler',
     'QueryBus',
     'SimpleQueryBus',
+    'CachingQueryBus',
+    'query_key',
     # errors
     'BaseError',
     'NotFoundError',
@@ -84,9 +131,16 @@ __all__ = (
     'IdInvalidError',
     'TimestampInvalidError',
     'DateTimeInvalidError',
+    'EventMapperAlreadyRegisteredError',
     'EventNotPublishedError',
+    'EventNotHandledError',
     'CommandNotRegisteredError',
     'QueryNotRegisteredError',
+    'AggregateVersionConflictError',
+    'EventStoreCorruptedError',
+    'CommandAlreadyRegisteredError',
+    'CommandNotDispatchedError',
+    'QueryAlreadyRegisteredError',
     # events
     'Event',
     'EventMapper',
@@ -94,12 +148,43 @@ __all__ = (
     'EventHandler',
     'EventBus',
     'SimpleEventBus',
+    'QueueEventBus',
+    'ProcessPoolEventBus',
     'find_event_mapper_by_name',
     'find_event_mapper_by_type',
     'EventPublishers',
+    'BufferedEventPublisher',
     'ConfigEventMappers',
     'EventMapperNotFoundError',
     'InternalEventPublisher',
+    'EventMetaFactory',
+    'set_event_meta_factory',
+    'generate_uuid4_id',
+    'MonotonicIdGenerator',
+    'seconds_clock',
+    'milliseconds_clock',
+    'nanoseconds_clock',
+    'slotted',
+    # event_stores
+    'EventStore',
+    'FileEventStore',
+    'SnapshotSerializer',
+    'PickleSnapshotSerializer',
+    'SnapshotStore',
+    'InMemorySnapshotStore',
+    'FileSnapshotStore',
+    'SnapshotPolicy',
+    'SnapshottingEventStore',
+    # metrics
+    'HandlerMetrics',
+    'DEFAULT_BUCKETS',
+    # middlewares
+    'Middleware',
+    'Next',
+    'compose_middlewares',
+    # offload
+    'ThreadOffload',
+    'blocking',
     # utils
     'get_env',
     'get_str_env',
@@ -1,7 +1,8 @@
-from abc import ABC
-from typing import List
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Dict, List, Optional, Type, TypeVar
 
-from .events import Event
+from .events import Event, EventPublisher
 
 
 class Aggregate(ABC):
@@ -21,3 +22,83 @@ class AggregateRoot(Aggregate):
 
     def record_aggregate_event(self, event: Event) -> None:
         self._events.append(event)
+
+
+class EventSourcedAggregateRoot(AggregateRoot):
+    """Aggregate root whose state is rebuilt by replaying its stored events."""
+
+    _version: int
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._version = 0
+
+    def version(self) -> int:
+        """Number of stored events already applied to this aggregate."""
+        return self._version
+
+    @abstractmethod
+    def apply(self, event: Event) -> None:
+        pass  # pragma: no cover
+
+    def replay(self, event: Event) -> None:
+        self.apply(event)
+        self._version += 1
+
+
+_AR = TypeVar('_AR', bound=AggregateRoot)
+
+
+class UnitOfWork:
+    """
+    Tracks the aggregate roots touched in a scope to publish all their recorded events with a single publish call.
+
+    commit pulls the events of every tracked aggregate and publishes them at once: events keep their recording order
+    within each aggregate, but are grouped aggregate by aggregate in tracking order (not interleaved in recording
+    order across aggregates). When publish raises, the events are put back in their aggregates, which stay tracked,
+    so the commit can be retried. rollback pulls and discards them. Used as an async context manager it commits
+    when the block succeeds and rolls back when it raises.
+    """
+
+    _publisher: EventPublisher
+    _aggregates: Dict[int, AggregateRoot]
+
+    def __init__(self, publisher: EventPublisher) -> None:
+        self._publisher = publisher
+        self._aggregates = {}
+
+    def track(self, aggregate: _AR) -> _AR:
+        self._aggregates.setdefault(id(aggregate), aggregate)
+        return aggregate
+
+    async def commit(self) -> None:
+        pulled = [(aggregate, aggregate.pull_aggregate_events()) for aggregate in self._aggregates.values()]
+        events = [event for _, aggregate_events in pulled for event in aggregate_events]
+        if events:
+            try:
+                await self._publisher.publish(events)
+            except BaseException:
+                for aggregate, aggregate_events in pulled:
+                    aggregate._events[:0] = aggregate_events
+                raise
+        for aggregate, _ in pulled:
+            self._aggregates.pop(id(aggregate), None)
+
+    def rollback(self) -> None:
+        aggregates, self._aggregates = self._aggregates, {}
+        for aggregate in aggregates.values():
+            aggregate.pull_aggregate_events()
+
+    async def __aenter__(self) -> 'UnitOfWork':
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            self.rollback()
@@ -0,0 +1,328 @@
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from json import dumps, loads
+from struct import Struct
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .events import ConfigEventMappers, Event, EventMapper
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class EventCodec(ABC):
+    """Turns the dict encoding of an EventMapper into bytes and back."""
+
+    @abstractmethod
+    def encode(self, mapper: EventMapper, msg: Event) -> bytes:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def decode(self, mapper: EventMapper, data: Buffer) -> Event:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def message_name(self, data: Buffer) -> str:
+        pass  # pragma: no cover
+
+    def decode_with(self, mappers: ConfigEventMappers, data: Buffer) -> Event:
+        return self.decode(mappers.find_by_name(self.message_name(data)), data)
+
+
+class JsonEventCodec(EventCodec):
+    def encode(self, mapper: EventMapper, msg: Event) -> bytes:
+        return dumps(mapper.encode(msg), separators=(',', ':')).encode()
+
+    def decode(self, mapper: EventMapper, data: Buffer) -> Event:
+        return mapper.decode(loads(bytes(data)))
+
+    def message_name(self, data: Buffer) -> str:
+        return str(loads(bytes(data))['meta']['message'])
+
+    def decode_with(self, mappers: ConfigEventMappers, data: Buffer) -> Event:
+        parsed = loads(bytes(data))
+        return mappers.find_by_name(parsed['meta']['message']).decode(parsed)
+
+
+class _BufferWriter:
+    """Writes in place into a memoryview, or a bytearray at any offset (growing it), like appending to a bytearray."""
+
+    __slots__ = ('_buffer', 'offset')
+
+    def __init__(self, buffer: Union[bytearray, memoryview], offset: int) -> None:
+        if offset > len(buffer):
+            raise ValueError(f'Offset {offset} out of a buffer of {len(buffer)} bytes')
+        self._buffer = buffer
+        self.offset = offset
+
+    def _reserve(self, size: int) -> int:
+        end = self.offset + size
+        if isinstance(self._buffer, memoryview) and end > len(self._buffer):
+            raise ValueError(f'Buffer too small: {len(self._buffer)} bytes available')
+        return end
+
+    def append(self, byte: int) -> None:
+        end = self._reserve(1)
+        self._buffer[self.offset : end] = bytes((byte,))
+        self.offset = end
+
+    def extend(self, data: bytes) -> None:
+        end = self._reserve(len(data))
+        self._buffer[self.offset : end] = data
+        self.offset = end
+
+
+_Output = Union[bytearray, _BufferWriter]
+
+_VERSION = 1
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _DICT, _POSITIONAL = range(11)
+_DOUBLE = Struct('<d')
+# fixed width so encode_many can reserve it and fill it in once the message is written in place
+_FRAME_SIZE = Struct('<I')
+_FRAME_SIZE_PLACEHOLDER = bytes(_FRAME_SIZE.size)
+_META_SCHEMA = ('id', 'type', 'occurred_on')
+
+
+def _write_varint(out: _Output, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: memoryview, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_str(out: _Output, value: str) -> None:
+    raw = value.encode()
+    _write_varint(out, len(raw))
+    out.extend(raw)
+
+
+def _read_str(data: memoryview, offset: int) -> Tuple[str, int]:
+    size, offset = _read_varint(data, offset)
+    return str(data[offset : offset + size], 'utf-8'), offset + size
+
+
+def _write_int(out: _Output, value: int) -> None:
+    out.append(_INT)
+    _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+
+
+def _write_float(out: _Output, value: float) -> None:
+    out.append(_FLOAT)
+    out.extend(_DOUBLE.pack(value))
+
+
+def _write_tagged_str(out: _Output, value: str) -> None:
+    out.append(_STR)
+    _write_str(out, value)
+
+
+def _write_bytes(out: _Output, value: bytes) -> None:
+    out.append(_BYTES)
+    _write_varint(out, len(value))
+    out.extend(value)
+
+
+def _write_items(tag: int) -> Callable[[_Output, Any], None]:
+    def writer(out: _Output, value: Any) -> None:
+        out.append(tag)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+
+    return writer
+
+
+def _write_dict(out: _Output, value: Dict[Any, Any]) -> None:
+    out.append(_DICT)
+    _write_varint(out, len(value))
+    for key, item in value.items():
+        _write_value(out, key)
+        _write_value(out, item)
+
+
+_WRITERS: Dict[type, Callable[[_Output, Any], None]] = {
+    type(None): lambda out, _: out.append(_NONE),
+    bool: lambda out, value: out.append(_TRUE if value else _FALSE),
+    int: _write_int,
+    float: _write_float,
+    str: _write_tagged_str,
+    bytes: _write_bytes,
+    list: _write_items(_LIST),
+    tuple: _write_items(_TUPLE),
+    dict: _write_dict,
+}
+
+
+def _write_value(out: _Output, value: Any) -> None:
+    writer = _WRITERS.get(type(value))
+    if writer is None:
+        raise TypeError(f'Object of type {type(value).__name__} is not supported by the binary event codec')
+    writer(out, value)
+
+
+def _read_value(data: memoryview, offset: int) -> Tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+    if tag == _STR:
+        return _read_str(data, offset)
+    if tag == _INT:
+        value, offset = _read_varint(data, offset)
+        return (value >> 1) if not value & 1 else -((value + 1) >> 1), offset
+    if tag == _NONE:
+        return None, offset
+    if tag in (_FALSE, _TRUE):
+        return tag == _TRUE, offset
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, offset)[0], offset + _DOUBLE.size
+    if tag == _BYTES:
+        size, offset = _read_varint(data, offset)
+        return bytes(data[offset : offset + size]), offset + size
+    if tag in (_LIST, _TUPLE):
+        size, offset = _read_varint(data, offset)
+        items = []
+        for _ in range(size):
+            item, offset = _read_value(data, offset)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), offset
+    if tag == _DICT:
+        size, offset = _read_varint(data, offset)
+        result = {}
+        for _ in range(size):
+            key, offset = _read_value(data, offset)
+            result[key], offset = _read_value(data, offset)
+        return result, offset
+    raise ValueError(f'Unknown binary event codec tag {tag}')
+
+
+def _write_struct(out: _Output, values: Dict[str, Any], schema: Tuple[str, ...]) -> None:
+    """Write values positionally when their keys are the schema, otherwise as a regular dict."""
+    if tuple(values) != schema:
+        _write_dict(out, values)
+        return
+    out.append(_POSITIONAL)
+    for value in values.values():
+        _write_value(out, value)
+
+
+def _read_struct(data: memoryview, offset: int, schema: Tuple[str, ...]) -> Tuple[Dict[str, Any], int]:
+    if data[offset] != _POSITIONAL:
+        return _read_value(data, offset)
+    offset += 1
+    values = {}
+    for name in schema:
+        values[name], offset = _read_value(data, offset)
+    return values, offset
+
+
+class BinaryEventCodec(EventCodec):
+    """
+    Compact binary format of the EventMapper dict encoding.
+
+    Meta and attributes are written positionally following the Event.Meta and Attributes dataclass fields,
+    so key names are not repeated on every message, and values are tagged so decode round-trips exactly.
+    Attributes whose keys do not match the dataclass fields (e.g. custom map_attributes) fall back to a dict.
+    """
+
+    _schemas: Dict[Type[Event], Tuple[str, ...]]
+
+    def __init__(self) -> None:
+        self._schemas = {}
+
+    def _schema(self, event_type: Type[Event]) -> Tuple[str, ...]:
+        schema = self._schemas.get(event_type)
+        if schema is None:
+            schema = self._schemas[event_type] = tuple(field_.name for field_ in fields(event_type.Attributes))
+        return schema
+
+    def _write(self, out: _Output, mapper: EventMapper, msg: Event) -> None:
+        data = mapper.encode(msg)
+        meta = {key: value for key, value in data.items() if key not in ('attributes', 'meta')}
+        out.append(_VERSION)
+        _write_str(out, data['meta']['message'])
+        _write_struct(out, meta, _META_SCHEMA)
+        _write_struct(out, data['attributes'], self._schema(mapper.event_type))
+
+    def encode(self, mapper: EventMapper, msg: Event) -> bytes:
+        out = bytearray()
+        self._write(out, mapper, msg)
+        return bytes(out)
+
+    def encode_into(
+        self, mapper: EventMapper, msg: Event, buffer: Union[bytearray, memoryview], offset: int = 0
+    ) -> int:
+        """
+        Write the message straight into buffer at offset and return the offset right after it.
+
+        A bytearray grows as needed, a memoryview raises ValueError when it is too small (keeping a partial write).
+        """
+        if isinstance(buffer, bytearray) and offset == len(buffer):
+            self._write(buffer, mapper, msg)
+            return len(buffer)
+        writer = _BufferWriter(buffer, offset)
+        self._write(writer, mapper, msg)
+        return writer.offset
+
+    def decode(self, mapper: EventMapper, data: Buffer) -> Event:
+        return mapper.decode(self._read(memoryview(data), 0, mapper.event_type)[0])
+
+    def message_name(self, data: Buffer) -> str:
+        view = memoryview(data)
+        self._check_version(view, 0)
+        return _read_str(view, 1)[0]
+
+    def encode_many(
+        self,
+        mappers: ConfigEventMappers,
+        msgs: List[Event],
+        buffer: Optional[bytearray] = None,
+    ) -> bytearray:
+        """Append length-prefixed messages to buffer (a new one if not given) resolving mappers once per type."""
+        buffer = bytearray() if buffer is None else buffer
+        resolved: Dict[Type[Event], EventMapper] = {}
+        for msg in msgs:
+            mapper = resolved.get(msg.__class__)
+            if mapper is None:
+                mapper = resolved[msg.__class__] = mappers.find_by_type(msg)
+            start = len(buffer)
+            buffer += _FRAME_SIZE_PLACEHOLDER
+            self._write(buffer, mapper, msg)
+            _FRAME_SIZE.pack_into(buffer, start, len(buffer) - start - _FRAME_SIZE.size)
+        return buffer
+
+    def decode_many(self, mappers: ConfigEventMappers, data: Buffer) -> Iterator[Event]:
+        """Decode length-prefixed messages written by encode_many without copying the input."""
+        view = memoryview(data)
+        resolved: Dict[str, EventMapper] = {}
+        offset = 0
+        while offset < len(view):
+            (size,) = _FRAME_SIZE.unpack_from(view, offset)
+            offset += _FRAME_SIZE.size
+            self._check_version(view, offset)
+            name = _read_str(view, offset + 1)[0]
+            mapper = resolved.get(name)
+            if mapper is None:
+                mapper = resolved[name] = mappers.find_by_name(name)
+            yield mapper.decode(self._read(view[offset : offset + size], 0, mapper.event_type)[0])
+            offset += size
+
+    @staticmethod
+    def _check_version(data: memoryview, offset: int) -> None:
+        if data[offset] != _VERSION:
+            raise ValueError(f'Unsupported binary event codec version {data[offset]}')
+
+    def _read(self, data: memoryview, offset: int, event_type: Type[Event]) -> Tuple[Dict[str, Any], int]:
+        self._check_version(data, offset)
+        name, offset = _read_str(data, offset + 1)
+        meta, offset = _read_struct(data, offset, _META_SCHEMA)
+        attributes, offset = _read_struct(data, offset, self._schema(event_type))
+        return {**meta, 'attributes': attributes, 'meta': {'message': name}}, offset
@@ -1,7 +1,110 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, Union
+from asyncio import (
+    CancelledError,
+    Future,
+    Handle,
+    Queue,
+    Task,
+    create_task,
+    ensure_future,
+    gather,
+    get_running_loop,
+    shield,
+)
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from functools import partial
+from time import monotonic
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from .errors import CommandNotRegisteredError, QueryNotRegisteredError
+from .errors import (
+    CommandAlreadyRegisteredError,
+    CommandNotDispatchedError,
+    CommandNotRegisteredError,
+    QueryAlreadyRegisteredError,
+    QueryNotRegisteredError,
+)
+from .events import Event, EventHandler
+from .metrics import HandlerMetrics
+from .middlewares import Middleware, compose_middlewares
+from .offload import ThreadOffload
+from .utils import _settle
+
+_H = TypeVar('_H')
+_M = TypeVar('_M')
+_R = TypeVar('_R')
+
+
+def _resolve_handler(handlers: Dict[type, _H], resolved: Dict[type, Optional[_H]], msg_type: type) -> Optional[_H]:
+    """Find (and cache) the handler of the closest class in the MRO of a concrete command/query class."""
+    try:
+        return resolved[msg_type]
+    except KeyError:
+        handler = resolved[msg_type] = next((handlers[base] for base in msg_type.__mro__ if base in handlers), None)
+        return handler
+
+
+async def _run_many(
+    call: Callable[[_M], Awaitable[_R]], msgs: Iterable[_M], concurrency: int
+) -> AsyncIterator[Tuple[int, Union[_R, BaseException]]]:
+    """
+    Call with every message, at most concurrency at the same time, yielding (position, result or error).
+
+    Errors are the Exception (or CancelledError) raised by a call, KeyboardInterrupt and SystemExit are re-raised.
+    """
+    if concurrency < 1:
+        raise ValueError('"concurrency" must be greater than 0')
+    pending = enumerate(msgs)
+    results: 'Queue[Optional[Tuple[int, Union[_R, BaseException]]]]' = Queue()
+    exits: List[BaseException] = []
+
+    async def work() -> None:
+        try:
+            for index, msg in pending:
+                result, err = await _settle(call(msg))
+                results.put_nowait((index, cast(_R, result) if err is None else err))
+        except (CancelledError, Exception):
+            raise
+        except BaseException as err:  # pylint: disable=broad-except
+            exits.append(err)
+        finally:
+            results.put_nowait(None)
+
+    workers = [create_task(work()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+                if exits:
+                    raise exits[0]
+            else:
+                yield result
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+async def _gather_many(results: AsyncIterator[Tuple[int, _R]], count: int) -> List[_R]:
+    by_index = {index: result async for index, result in results}
+    return [by_index[index] for index in range(count)]
 
 
 class Command(ABC):
@@ -23,24 +126,180 @@ class CommandBus(ABC):
     async def dispatch(self, command: Command) -> None:
         pass  # pragma: no cover
 
+    async def dispatch_many(
+        self, commands: Iterable[Command], *, concurrency: int = 10
+    ) -> List[Optional[BaseException]]:
+        """Dispatch commands (at most concurrency at the same time) returning the error of each one, if any."""
+        commands = list(commands)
+        return await _gather_many(self.dispatch_many_as_completed(commands, concurrency=concurrency), len(commands))
+
+    def dispatch_many_as_completed(
+        self, commands: Iterable[Command], *, concurrency: int = 10
+    ) -> AsyncIterator[Tuple[int, Optional[BaseException]]]:
+        """Like dispatch_many, yielding the position and error of each command as soon as it is handled."""
+        return _run_many(self.dispatch, commands, concurrency)
+
 
 class SimpleCommandBus(CommandBus):
-    _handlers: List[CommandHandler]
+    """
+    Command bus dispatching to the handler subscribed to the command type.
+
+    Middlewares wrap every dispatch call, see compose_middlewares. The chain is composed when middlewares are
+    added, so dispatch is left untouched while there are none. Handler calls are recorded in metrics, if given,
+    and blocking handlers run in the offload thread pool, if given.
+    """
+
+    _handlers: Dict[Type[Command], CommandHandler]
+    _resolved: Dict[type, Optional[CommandHandler]]
+    _middlewares: List[Middleware]
+    _metrics: Optional[HandlerMetrics]
+    _offload: Optional[ThreadOffload]
 
-    def __init__(self, handlers: List[CommandHandler]) -> None:
-        self._handlers = handlers
+    def __init__(
+        self,
+        handlers: List[CommandHandler],
+        *,
+        middlewares: Optional[List[Middleware]] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        offload: Optional[ThreadOffload] = None,
+    ) -> None:
+        self._handlers = {}
+        self._resolved = {}
+        self._middlewares = []
+        self._metrics = metrics
+        self._offload = offload
+        self.add_handler(handlers)
+        if middlewares:
+            self.add_middleware(middlewares)
 
     def add_handler(self, handler: Union[CommandHandler, List[CommandHandler]]) -> None:
         if not isinstance(handler, list):
             handler = [handler]
         for handler_ in handler:
-            self._handlers.append(handler_)
+            command_type = handler_.subscribed_to()
+            if command_type in self._handlers:
+                raise CommandAlreadyRegisteredError.create(detail={'command': command_type.__name__})
+            if self._offload:
+                handler_ = self._offload.wrap(handler_)
+            self._handlers[command_type] = self._metrics.instrument(handler_, 'command') if self._metrics else handler_
+        self._resolved.clear()
+
+    def add_middleware(self, middleware: Union[Middleware, List[Middleware]]) -> None:
+        self._middlewares += middleware if isinstance(middleware, list) else [middleware]
+        pipeline = compose_middlewares(self._middlewares, partial(type(self).dispatch, self))
+
+        def dispatch(command: Command) -> Awaitable[None]:
+            return pipeline(command)
+
+        self.dispatch = dispatch  # type: ignore
 
     async def dispatch(self, command: Command) -> None:
-        handlers = [handler for handler in self._handlers if isinstance(command, handler.subscribed_to())]
-        if len(handlers) != 1:
+        handler = _resolve_handler(self._handlers, self._resolved, command.__class__)
+        if handler is None:
             raise CommandNotRegisteredError.create(detail={'command': command.__class__.__name__})
-        await handlers[0].handle(command)
+        await handler.handle(command)
+
+
+_LaneItem = Tuple[Command, 'Future[None]']
+
+
+class PartitionedCommandBus(CommandBus):
+    """
+    Command bus running the commands with the same key (e.g. their aggregate id) strictly in order.
+
+    Every key is assigned to one of lanes worker tasks, each one dispatching its queued commands to command_bus
+    one after another, so commands with different keys run concurrently without racing on the same aggregate.
+    dispatch waits until the command has been handled and raises its error. Each lane queues at most
+    max_size commands (unbounded by default), dispatch waits for room when the lane is full.
+    Commands whose dispatch was cancelled before they started are skipped.
+    """
+
+    _command_bus: CommandBus
+    _key: Callable[[Command], Hashable]
+    _lanes_count: int
+    _max_size: int
+    _queues: List['Queue[_LaneItem]']
+    _workers: List['Task[None]']
+    _closed: bool
+    _stats: List[Dict[str, int]]
+
+    def __init__(
+        self,
+        command_bus: CommandBus,
+        key: Callable[[Command], Hashable],
+        *,
+        lanes: int = 8,
+        max_size: int = 0,
+    ) -> None:
+        if lanes < 1:
+            raise ValueError('"lanes" must be greater than 0')
+        self._command_bus = command_bus
+        self._key = key
+        self._lanes_count = lanes
+        self._max_size = max_size
+        self._queues = []
+        self._workers = []
+        self._closed = False
+        self._stats = [{'dispatched': 0, 'failed': 0, 'max_depth': 0} for _ in range(lanes)]
+
+    def _start(self) -> List['Queue[_LaneItem]']:
+        if not self._queues:
+            self._queues = [Queue(self._max_size) for _ in range(self._lanes_count)]
+            self._workers = [create_task(self._work(lane, queue)) for lane, queue in enumerate(self._queues)]
+        return self._queues
+
+    def lane(self, command: Command) -> int:
+        return hash(self._key(command)) % self._lanes_count
+
+    async def dispatch(self, command: Command) -> None:
+        if self._closed:
+            raise CommandNotDispatchedError.create(detail={'reason': 'closed'})
+        lane = self.lane(command)
+        queue = self._start()[lane]
+        future: 'Future[None]' = get_running_loop().create_future()
+        await queue.put((command, future))
+        stats = self._stats[lane]
+        stats['max_depth'] = max(stats['max_depth'], queue.qsize())
+        await future
+
+    async def _work(self, lane: int, queue: 'Queue[_LaneItem]') -> None:
+        stats = self._stats[lane]
+        while True:
+            command, future = await queue.get()
+            try:
+                if future.done():
+                    continue
+                _, err = await _settle(self._command_bus.dispatch(command))
+                if err is None:
+                    stats['dispatched'] += 1
+                    if not future.done():
+                        future.set_result(None)
+                else:
+                    stats['failed'] += 1
+                    if not future.done():
+                        future.set_exception(err)
+            finally:
+                queue.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every queued command has been handled."""
+        await gather(*(queue.join() for queue in self._queues))
+
+    async def close(self) -> None:
+        """Stop accepting commands, handle the queued ones and stop the workers."""
+        self._closed = True
+        await self.drain()
+        for worker in self._workers:
+            worker.cancel()
+        await gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> List[Dict[str, int]]:
+        """Queue depth and command counters of every lane."""
+        return [
+            {'depth': self._queues[lane].qsize() if self._queues else 0, **stats}
+            for lane, stats in enumerate(self._stats)
+        ]
 
 
 class Query(ABC):
@@ -64,26 +323,350 @@ class QueryHandler(ABC):
         pass  # pragma: no cover
 
 
+_PendingQuery = Tuple[Query, 'Future[OptionalResponse]']
+
+
+class BatchQueryHandler(QueryHandler):
+    """
+    Query handler resolving the queries asked in the same event loop tick (or batch_window seconds) at once.
+
+    Every handle call joins the pending batch, which handle_many resolves once the window elapses or it holds
+    max_batch_size queries. Each caller gets the response at the position of its query, raising it instead when
+    it is an exception, and every caller of the batch gets the error when handle_many fails.
+    """
+
+    _pending: Optional[List[_PendingQuery]] = None
+    _flush: Optional[Handle] = None
+    _background: Optional[Set['Task[None]']] = None
+
+    def max_batch_size(self) -> int:
+        return 100
+
+    def batch_window(self) -> float:
+        """Seconds to wait for more queries, 0 resolves the batch in the next event loop iteration."""
+        return 0.0
+
+    @abstractmethod
+    async def handle_many(self, queries: List[Query]) -> List[Union[OptionalResponse, Exception]]:
+        """Responses (or errors) in the same order as queries."""
+        pass  # pragma: no cover
+
+    async def handle(self, query: Query) -> OptionalResponse:
+        loop = get_running_loop()
+        future: 'Future[OptionalResponse]' = loop.create_future()
+        if self._pending is None:
+            self._pending = []
+        self._pending.append((query, future))
+        if len(self._pending) >= self.max_batch_size():
+            self._dispatch()
+        elif self._flush is None:
+            window = self.batch_window()
+            self._flush = loop.call_later(window, self._dispatch) if window > 0 else loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        batch, self._pending = self._pending or [], []
+        if batch:
+            if self._background is None:
+                self._background = set()
+            task = create_task(self._resolve_batch(batch))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _resolve_batch(self, batch: List[_PendingQuery]) -> None:
+        try:
+            responses = await self.handle_many([query for query, _ in batch])
+            if len(responses) != len(batch):
+                raise ValueError(f'handle_many returned {len(responses)} responses for {len(batch)} queries')
+        except CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as err:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for (_, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
 class QueryBus(ABC):
     @abstractmethod
     async def ask(self, query: Query) -> OptionalResponse:
         pass  # pragma: no cover
 
+    async def ask_many(
+        self, queries: Iterable[Query], *, concurrency: int = 10
+    ) -> List[Union[OptionalResponse, BaseException]]:
+        """Ask queries (at most concurrency at the same time) returning the response or error of each one."""
+        queries = list(queries)
+        return await _gather_many(self.ask_many_as_completed(queries, concurrency=concurrency), len(queries))
+
+    def ask_many_as_completed(
+        self, queries: Iterable[Query], *, concurrency: int = 10
+    ) -> AsyncIterator[Tuple[int, Union[OptionalResponse, BaseException]]]:
+        """Like ask_many, yielding the position and response (or error) of each query as soon as it is answered."""
+        return _run_many(self.ask, queries, concurrency)
+
+
+class _Flight:
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self, future: 'Future[OptionalResponse]') -> None:
+        self.future = future
+        self.waiters = 0
+
 
 class SimpleQueryBus(QueryBus):
-    _handlers: List[QueryHandler]
+    """
+    Query bus asking the handler subscribed to the query type.
+
+    In single_flight mode, concurrent asks of equal queries (same type and key) share one in-flight handle call
+    instead of running the handler once per caller. A caller being cancelled does not cancel the shared call
+    while other callers are still waiting for it. Nothing is kept once the call is done.
+    Middlewares, metrics and offload work as with SimpleCommandBus.
+    """
 
-    def __init__(self, handlers: List[QueryHandler]) -> None:
-        self._handlers = handlers
+    _handlers: Dict[Type[Query], QueryHandler]
+    _resolved: Dict[type, Optional[QueryHandler]]
+    _single_flight: bool
+    _key: Callable[[Query], Hashable]
+    _in_flight: Dict[Tuple[type, Hashable], _Flight]
+    _middlewares: List[Middleware]
+    _metrics: Optional[HandlerMetrics]
+    _offload: Optional[ThreadOffload]
+
+    def __init__(
+        self,
+        handlers: List[QueryHandler],
+        *,
+        single_flight: bool = False,
+        key: Optional[Callable[[Query], Hashable]] = None,
+        middlewares: Optional[List[Middleware]] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        offload: Optional[ThreadOffload] = None,
+    ) -> None:
+        self._handlers = {}
+        self._resolved = {}
+        self._single_flight = single_flight
+        self._key = key or query_key
+        self._in_flight = {}
+        self._middlewares = []
+        self._metrics = metrics
+        self._offload = offload
+        self.add_handler(handlers)
+        if middlewares:
+            self.add_middleware(middlewares)
 
     def add_handler(self, handler: Union[QueryHandler, List[QueryHandler]]) -> None:
         if not isinstance(handler, list):
             handler = [handler]
         for handler_ in handler:
-            self._handlers.append(handler_)
+            query_type = handler_.subscribed_to()
+            if query_type in self._handlers:
+                raise QueryAlreadyRegisteredError.create(detail={'query': query_type.__name__})
+            if self._offload:
+                handler_ = self._offload.wrap(handler_)
+            self._handlers[query_type] = self._metrics.instrument(handler_, 'query') if self._metrics else handler_
+        self._resolved.clear()
+
+    def add_middleware(self, middleware: Union[Middleware, List[Middleware]]) -> None:
+        self._middlewares += middleware if isinstance(middleware, list) else [middleware]
+        pipeline = compose_middlewares(self._middlewares, partial(type(self).ask, self))
+
+        def ask(query: Query) -> Awaitable[OptionalResponse]:
+            return pipeline(query)
+
+        self.ask = ask  # type: ignore
 
     async def ask(self, query: Query) -> OptionalResponse:
-        handlers = [handler for handler in self._handlers if isinstance(query, handler.subscribed_to())]
-        if len(handlers) != 1:
+        handler = _resolve_handler(self._handlers, self._resolved, query.__class__)
+        if handler is None:
             raise QueryNotRegisteredError.create(detail={'query': query.__class__.__name__})
-        return await handlers[0].handle(query)
+        if self._single_flight:
+            return await self._ask_shared(handler, query)
+        return await handler.handle(query)
+
+    async def _ask_shared(self, handler: QueryHandler, query: Query) -> OptionalResponse:
+        key = (query.__class__, self._key(query))
+        flight = self._in_flight.get(key)
+        if flight is None:
+            new_flight = flight = self._in_flight[key] = _Flight(ensure_future(handler.handle(query)))
+            new_flight.future.add_done_callback(lambda _: self._land(key, new_flight))
+        flight.waiters += 1
+        try:
+            return await shield(flight.future)
+        except CancelledError:
+            if flight.waiters == 1 and not flight.future.done():
+                self._land(key, flight)
+                flight.future.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _land(self, key: Tuple[type, Hashable], flight: _Flight) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted(((key, _freeze(item)) for key, item in value.items()), key=repr))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return _freeze(_fields_of(value))
+    return cast(Hashable, value)
+
+
+def _fields_of(obj: Any) -> Dict[str, Any]:
+    if is_dataclass(obj):
+        return {field_.name: getattr(obj, field_.name) for field_ in fields(obj)}
+    values = dict(getattr(obj, '__dict__', {}))
+    for slot in getattr(obj.__class__, '__slots__', ()):
+        if hasattr(obj, slot):
+            values[slot] = getattr(obj, slot)
+    return values
+
+
+def query_key(query: Query) -> Hashable:
+    """Default cache key of a query: its fields (dataclass fields, instance attributes or slots)."""
+    return _freeze(_fields_of(query))
+
+
+class CachingQueryBus(QueryBus):
+    """
+    Query bus caching the responses of another query bus.
+
+    Only query types with a TTL (seconds) in ttl, or every type when default_ttl is given, are cached.
+    Entries are evicted in least recently used order once max_size is reached, and the entries of the query types
+    mapped to an event type in invalidate_on are dropped when such an event goes through the event bus where
+    invalidation_handler() is registered. Cached responses are shared, callers must not mutate them.
+    """
+
+    _query_bus: QueryBus
+    _ttl: Dict[Type[Query], float]
+    _default_ttl: Optional[float]
+    _max_size: int
+    _key: Callable[[Query], Hashable]
+    _clock: Callable[[], float]
+    _invalidate_on: Dict[Type[Event], List[Type[Query]]]
+    _entries: 'OrderedDict[Tuple[type, Hashable], Tuple[float, OptionalResponse]]'
+    _keys_by_type: Dict[type, Set[Tuple[type, Hashable]]]
+    _ttl_by_type: Dict[type, Optional[float]]
+    _generations: Dict[Optional[type], int]
+    _stats: Dict[str, int]
+
+    def __init__(
+        self,
+        query_bus: QueryBus,
+        *,
+        ttl: Optional[Dict[Type[Query], float]] = None,
+        default_ttl: Optional[float] = None,
+        max_size: int = 1024,
+        key: Callable[[Query], Hashable] = query_key,
+        invalidate_on: Optional[Dict[Type[Event], List[Type[Query]]]] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError('"max_size" must be greater than 0')
+        self._query_bus = query_bus
+        self._ttl = ttl or {}
+        self._default_ttl = default_ttl
+        self._max_size = max_size
+        self._key = key
+        self._clock = clock
+        self._invalidate_on = invalidate_on or {}
+        self._entries = OrderedDict()
+        self._keys_by_type = {}
+        self._ttl_by_type = {}
+        self._generations = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _resolve_ttl(self, query_type: type) -> Optional[float]:
+        try:
+            return self._ttl_by_type[query_type]
+        except KeyError:
+            ttl = self._ttl_by_type[query_type] = next(
+                (self._ttl[base] for base in query_type.__mro__ if base in self._ttl), self._default_ttl
+            )
+            return ttl
+
+    async def ask(self, query: Query) -> OptionalResponse:
+        query_type = query.__class__
+        ttl = self._resolve_ttl(query_type)
+        if ttl is None:
+            return await self._query_bus.ask(query)
+        key = (query_type, self._key(query))
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
+        self._stats['misses'] += 1
+        generation = self._generation(query_type)
+        response = await self._query_bus.ask(query)
+        if generation != self._generation(query_type):
+            return response
+        self._entries[key] = (now + ttl, response)
+        self._entries.move_to_end(key)
+        self._keys_by_type.setdefault(query_type, set()).add(key)
+        while len(self._entries) > self._max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._keys_by_type[evicted[0]].discard(evicted)
+            self._stats['evictions'] += 1
+        return response
+
+    def _generation(self, query_type: type) -> int:
+        """Invalidations of the query type, its bases or the whole cache, they only increase."""
+        return self._generations.get(None, 0) + sum(self._generations.get(base, 0) for base in query_type.__mro__)
+
+    def invalidate(self, query_type: Optional[Type[Query]] = None) -> None:
+        """
+        Drop the cached responses of a query type (and its subclasses), or all of them.
+
+        Responses of asks already in flight are not cached either, as they may have been read before the change.
+        """
+        self._generations[query_type] = self._generations.get(query_type, 0) + 1
+        for cached_type in list(self._keys_by_type):
+            if query_type is None or issubclass(cached_type, query_type):
+                for key in self._keys_by_type.pop(cached_type):
+                    if self._entries.pop(key, None) is not None:
+                        self._stats['invalidations'] += 1
+
+    def invalidation_handler(self) -> EventHandler:
+        """Event handler to register on an event bus so events in invalidate_on drop their query types."""
+        return _CacheInvalidationEventHandler(self, self._invalidate_on)
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), **self._stats}
+
+
+class _CacheInvalidationEventHandler(EventHandler):
+    __slots__ = ('_cache', '_invalidate_on')
+
+    def __init__(self, cache: CachingQueryBus, invalidate_on: Dict[Type[Event], List[Type[Query]]]) -> None:
+        self._cache = cache
+        self._invalidate_on = invalidate_on
+
+    def subscribed_to(self) -> List[Type[Event]]:
+        return list(self._invalidate_on)
+
+    async def handle(self, events: List[Event]) -> None:
+        for event in events:
+            for event_type, query_types in self._invalidate_on.items():
+                if isinstance(event, event_type):
+                    for query_type in query_types:
+                        self._cache.invalidate(query_type)
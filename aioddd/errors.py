@@ -1,5 +1,5 @@
 from json import dumps
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 
@@ -119,11 +119,39 @@ class EventMapperNotFoundError(NotFoundError):
     _title = 'Event Mapper not found'
 
 
+class EventMapperAlreadyRegisteredError(ConflictError):
+    _code = 'event_mapper_already_registered'
+    _title = 'Event Mapper already registered'
+
+
 class EventNotPublishedError(ConflictError):
     _code = 'event_not_published'
     _title = 'Event not published'
 
 
+class EventNotHandledError(ConflictError):
+    _code = 'event_not_handled'
+    _title = 'Event not handled'
+    _errors: List[BaseException]
+
+    def with_errors(self, errors: List[BaseException]) -> 'EventNotHandledError':
+        self._errors = errors
+        return self
+
+    def errors(self) -> List[BaseException]:
+        return getattr(self, '_errors', [])
+
+
+class AggregateVersionConflictError(ConflictError):
+    _code = 'aggregate_version_conflict'
+    _title = 'Aggregate version conflict'
+
+
+class EventStoreCorruptedError(ConflictError):
+    _code = 'event_store_corrupted'
+    _title = 'Event store corrupted'
+
+
 class CommandNotRegisteredError(NotFoundError):
     _code = 'command_not_registered_error'
     _title = 'Command not registered'
@@ -132,3 +160,18 @@ class CommandNotRegisteredError(NotFoundError):
 class QueryNotRegisteredError(NotFoundError):
     _code = 'query_not_registered_error'
     _title = 'Query not registered'
+
+
+class CommandNotDispatchedError(ConflictError):
+    _code = 'command_not_dispatched_error'
+    _title = 'Command not dispatched'
+
+
+class CommandAlreadyRegisteredError(ConflictError):
+    _code = 'command_already_registered_error'
+    _title = 'Command already registered'
+
+
+class QueryAlreadyRegisteredError(ConflictError):
+    _code = 'query_already_registered_error'
+    _title = 'Query already registered'
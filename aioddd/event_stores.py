@@ -0,0 +1,420 @@
+from abc import ABC, abstractmethod
+from asyncio import get_running_loop
+from contextlib import suppress
+from io import FileIO
+from mmap import ACCESS_READ, mmap
+from os import fsync, replace, unlink
+from pathlib import Path
+from pickle import dumps, loads  # nosec
+from struct import Struct
+from tempfile import mkstemp
+from threading import Lock
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+from urllib.parse import quote
+from zlib import crc32
+
+from .aggregates import EventSourcedAggregateRoot
+from .codecs import BinaryEventCodec, EventCodec
+from .errors import AggregateVersionConflictError, EventStoreCorruptedError
+from .events import ConfigEventMappers, Event
+
+_A = TypeVar('_A', bound=EventSourcedAggregateRoot)
+
+
+class EventStore(ABC):
+    @abstractmethod
+    async def append(self, aggregate_id: str, events: List[Event], expected_version: Optional[int] = None) -> int:
+        """Append events to the aggregate stream and return its new version."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def read(self, aggregate_id: str, from_version: int = 0) -> AsyncIterator[Event]:
+        """Stream the aggregate events stored after from_version."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def version(self, aggregate_id: str) -> int:
+        pass  # pragma: no cover
+
+    async def load(self, aggregate: _A, aggregate_id: str) -> _A:
+        """Replay the stored events the aggregate has not applied yet."""
+        async for event in self.read(aggregate_id, from_version=aggregate.version()):
+            aggregate.replay(event)
+        return aggregate
+
+
+# payload size, crc32 (aggregate id + payload), version, aggregate id size
+_HEADER = Struct('<IIQH')
+_SEGMENT_SUFFIX = '.log'
+
+# segment number, payload offset, payload size
+_IndexEntry = Tuple[int, int, int]
+
+
+class FileEventStore(EventStore):
+    """
+    Event store backed by append-only segment files in a local directory.
+
+    Every record holds the aggregate id, its version and the event encoded with codec (binary by default).
+    The index by aggregate id and version is rebuilt scanning the record headers when the store is opened,
+    truncating a torn record at the end of the last segment. Appends are fsync-ed once every fsync_every events
+    (or on sync/close), and reads decode memory-mapped records in place through the event mappers.
+    """
+
+    _path: Path
+    _mappers: ConfigEventMappers
+    _codec: EventCodec
+    _fsync_every: int
+    _segment_size: int
+    _index: Dict[str, List[_IndexEntry]]
+    _segment: int
+    _file: Optional[FileIO]
+    _size: int
+    _pending: int
+    _maps: Dict[int, Tuple[mmap, memoryview]]
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mappers: ConfigEventMappers,
+        *,
+        codec: Optional[EventCodec] = None,
+        fsync_every: int = 100,
+        segment_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        self._path = Path(path)
+        self._mappers = mappers
+        self._codec = codec or BinaryEventCodec()
+        self._fsync_every = fsync_every
+        self._segment_size = segment_size
+        self._index = {}
+        self._segment = 0
+        self._file = None
+        self._size = 0
+        self._pending = 0
+        self._maps = {}
+        self._path.mkdir(parents=True, exist_ok=True)
+        segment_paths = sorted(self._path.glob(f'*{_SEGMENT_SUFFIX}'))
+        for position, segment_path in enumerate(segment_paths, 1):
+            self._segment = int(segment_path.stem)
+            self._size = self._scan(self._segment, segment_path, last=position == len(segment_paths))
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._path / f'{segment:020d}{_SEGMENT_SUFFIX}'
+
+    def _scan(self, segment: int, segment_path: Path, last: bool) -> int:
+        """
+        Index the records of a segment and return its size.
+
+        Only a torn record at the end of the last segment (an interrupted append) is truncated, any other invalid
+        record raises EventStoreCorruptedError leaving the files untouched.
+        """
+        size = segment_path.stat().st_size
+        offset = 0
+        if size:
+            with segment_path.open('rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+                while offset < size:
+                    if offset + _HEADER.size > size:
+                        reason, at_tail = 'torn_record', True
+                    else:
+                        payload_size, checksum, version, id_size = _HEADER.unpack_from(data, offset)
+                        start = offset + _HEADER.size
+                        end = start + id_size + payload_size
+                        if end > size:
+                            reason, at_tail = 'torn_record', True
+                        elif crc32(data[start:end]) != checksum:
+                            reason, at_tail = 'checksum_mismatch', end == size
+                        else:
+                            aggregate_id = data[start : start + id_size].decode()
+                            entries = self._index.setdefault(aggregate_id, [])
+                            if version == len(entries) + 1:
+                                entries.append((segment, start + id_size, payload_size))
+                                offset = end
+                                continue
+                            reason, at_tail = 'version_gap', False
+                    if not (last and at_tail):
+                        raise EventStoreCorruptedError.create(
+                            detail={'segment': segment_path.name, 'offset': offset, 'reason': reason}
+                        )
+                    break
+        if offset < size:
+            with segment_path.open('r+b') as torn_file:
+                torn_file.truncate(offset)
+        return offset
+
+    def version(self, aggregate_id: str) -> int:
+        return len(self._index.get(aggregate_id, ()))
+
+    async def append(self, aggregate_id: str, events: List[Event], expected_version: Optional[int] = None) -> int:
+        entries = self._index.setdefault(aggregate_id, [])
+        if expected_version is not None and expected_version != len(entries):
+            raise AggregateVersionConflictError.create(
+                detail={'aggregate_id': aggregate_id, 'expected_version': expected_version, 'version': len(entries)}
+            )
+        file = self._writable()
+        raw_id = aggregate_id.encode()
+        records = bytearray()
+        new_entries: List[_IndexEntry] = []
+        for event in events:
+            payload = self._codec.encode(self._mappers.find_by_type(event), event)
+            version = len(entries) + len(new_entries) + 1
+            records += _HEADER.pack(len(payload), crc32(payload, crc32(raw_id)), version, len(raw_id))
+            new_entries.append((self._segment, self._size + len(records) + len(raw_id), len(payload)))
+            records += raw_id
+            records += payload
+        try:
+            view = memoryview(records)
+            while view:
+                view = view[file.write(view) :]
+        except BaseException:
+            file.truncate(self._size)
+            raise
+        self._size += len(records)
+        entries.extend(new_entries)
+        self._pending += len(events)
+        if self._pending >= self._fsync_every:
+            await self.sync()
+        return len(entries)
+
+    def _writable(self) -> FileIO:
+        if self._file is not None and self._size >= self._segment_size:
+            self._close_file()
+            self._segment += 1
+            self._size = 0
+        if self._file is None:
+            self._file = self._segment_path(self._segment).open('ab', buffering=0)
+        return self._file
+
+    async def sync(self) -> None:
+        """fsync the appended events."""
+        if self._file is not None and self._pending:
+            self._pending = 0
+            await get_running_loop().run_in_executor(None, fsync, self._file.fileno())
+
+    async def read(self, aggregate_id: str, from_version: int = 0) -> AsyncIterator[Event]:
+        for segment, offset, size in self._index.get(aggregate_id, [])[from_version:]:
+            yield self._codec.decode_with(self._mappers, self._view(segment, offset + size)[offset : offset + size])
+
+    def _view(self, segment: int, end: int) -> memoryview:
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped[1]) < end:
+            if mapped is not None:
+                self._unmap(segment)
+            with self._segment_path(segment).open('rb') as file:
+                data = mmap(file.fileno(), 0, access=ACCESS_READ)
+            mapped = self._maps[segment] = (data, memoryview(data))
+        return mapped[1]
+
+    def _unmap(self, segment: int) -> None:
+        data, view = self._maps.pop(segment)
+        try:
+            view.release()
+            data.close()
+        except BufferError:  # pragma: no cover
+            pass  # still referenced by a decoded slice, closed once it is garbage collected
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._pending = 0
+
+    async def close(self) -> None:
+        await self.sync()
+        self._close_file()
+        for segment in list(self._maps):
+            self._unmap(segment)
+
+
+class SnapshotSerializer(ABC):
+    @abstractmethod
+    def serialize(self, aggregate: EventSourcedAggregateRoot) -> bytes:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def deserialize(self, data: bytes) -> EventSourcedAggregateRoot:
+        pass  # pragma: no cover
+
+
+class PickleSnapshotSerializer(SnapshotSerializer):
+    """Pickle based snapshots, only for snapshot stores nobody else can write to."""
+
+    def serialize(self, aggregate: EventSourcedAggregateRoot) -> bytes:
+        return dumps(aggregate)
+
+    def deserialize(self, data: bytes) -> EventSourcedAggregateRoot:
+        return cast(EventSourcedAggregateRoot, loads(data))  # nosec
+
+
+class SnapshotStore(ABC):
+    @abstractmethod
+    async def save(self, aggregate_id: str, version: int, data: bytes) -> None:
+        """Keep data as the latest aggregate snapshot, unless a snapshot of a higher version is already kept."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def latest(self, aggregate_id: str) -> Optional[Tuple[int, bytes]]:
+        """Version and data of the latest aggregate snapshot, if any."""
+        pass  # pragma: no cover
+
+    async def latest_version(self, aggregate_id: str) -> int:
+        """Version of the latest aggregate snapshot, 0 if there is none."""
+        snapshot = await self.latest(aggregate_id)
+        return snapshot[0] if snapshot is not None else 0
+
+
+class InMemorySnapshotStore(SnapshotStore):
+    _snapshots: Dict[str, Tuple[int, bytes]]
+
+    def __init__(self) -> None:
+        self._snapshots = {}
+
+    async def save(self, aggregate_id: str, version: int, data: bytes) -> None:
+        snapshot = self._snapshots.get(aggregate_id)
+        if snapshot is None or snapshot[0] <= version:
+            self._snapshots[aggregate_id] = (version, data)
+
+    async def latest(self, aggregate_id: str) -> Optional[Tuple[int, bytes]]:
+        return self._snapshots.get(aggregate_id)
+
+
+_SNAPSHOT_VERSION = Struct('<Q')
+
+
+class FileSnapshotStore(SnapshotStore):
+    """
+    Keeps the latest snapshot of every aggregate in its own file, fsync-ed and replaced atomically.
+
+    Every save writes its own temporary file, so concurrent saves of an aggregate do not clash, and the highest
+    version wins whatever the order they finish in.
+    """
+
+    _path: Path
+    _lock: Lock
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+
+    def _snapshot_path(self, aggregate_id: str) -> Path:
+        return self._path / f'{quote(aggregate_id, safe="")}.snapshot'
+
+    async def save(self, aggregate_id: str, version: int, data: bytes) -> None:
+        await get_running_loop().run_in_executor(None, self._save, aggregate_id, version, data)
+
+    def _save(self, aggregate_id: str, version: int, data: bytes) -> None:
+        fd, tmp_path = mkstemp(suffix='.tmp', dir=self._path)
+        try:
+            with open(fd, 'wb') as file:
+                file.write(_SNAPSHOT_VERSION.pack(version))
+                file.write(data)
+                file.flush()
+                fsync(file.fileno())
+            with self._lock:
+                if self._latest_version(aggregate_id) <= version:
+                    replace(tmp_path, self._snapshot_path(aggregate_id))
+        finally:
+            with suppress(FileNotFoundError):
+                unlink(tmp_path)
+
+    async def latest(self, aggregate_id: str) -> Optional[Tuple[int, bytes]]:
+        return await get_running_loop().run_in_executor(None, self._latest, aggregate_id)
+
+    def _latest(self, aggregate_id: str) -> Optional[Tuple[int, bytes]]:
+        try:
+            data = self._snapshot_path(aggregate_id).read_bytes()
+        except FileNotFoundError:
+            return None
+        return _SNAPSHOT_VERSION.unpack_from(data)[0], data[_SNAPSHOT_VERSION.size :]
+
+    async def latest_version(self, aggregate_id: str) -> int:
+        return await get_running_loop().run_in_executor(None, self._latest_version, aggregate_id)
+
+    def _latest_version(self, aggregate_id: str) -> int:
+        try:
+            with self._snapshot_path(aggregate_id).open('rb') as file:
+                return int(_SNAPSHOT_VERSION.unpack(file.read(_SNAPSHOT_VERSION.size))[0])
+        except FileNotFoundError:
+            return 0
+
+
+class SnapshotPolicy:
+    """Take a snapshot once every events have been applied since the latest one."""
+
+    __slots__ = '_every'
+
+    def __init__(self, every: int = 100) -> None:
+        if every < 1:
+            raise ValueError('"every" must be greater than 0')
+        self._every = every
+
+    def should_snapshot(self, snapshot_version: int, version: int) -> bool:
+        return version - snapshot_version >= self._every
+
+
+class SnapshottingEventStore(EventStore):
+    """
+    Event store loading aggregates from their latest snapshot and replaying only the newer events.
+
+    A new snapshot is taken after a load when the policy says so. Pickle snapshots are only used by default with
+    an InMemorySnapshotStore, any other snapshot store requires an explicit serializer, as pickle data read back
+    from shared storage can run arbitrary code.
+    """
+
+    _event_store: EventStore
+    _snapshot_store: SnapshotStore
+    _serializer: SnapshotSerializer
+    _policy: SnapshotPolicy
+
+    def __init__(
+        self,
+        event_store: EventStore,
+        snapshot_store: SnapshotStore,
+        *,
+        serializer: Optional[SnapshotSerializer] = None,
+        policy: Optional[SnapshotPolicy] = None,
+    ) -> None:
+        if serializer is None and not isinstance(snapshot_store, InMemorySnapshotStore):
+            raise ValueError('"serializer" must be given for snapshot stores other than InMemorySnapshotStore')
+        self._event_store = event_store
+        self._snapshot_store = snapshot_store
+        self._serializer = serializer or PickleSnapshotSerializer()
+        self._policy = policy or SnapshotPolicy()
+
+    async def append(self, aggregate_id: str, events: List[Event], expected_version: Optional[int] = None) -> int:
+        return await self._event_store.append(aggregate_id, events, expected_version)
+
+    def read(self, aggregate_id: str, from_version: int = 0) -> AsyncIterator[Event]:
+        return self._event_store.read(aggregate_id, from_version)
+
+    def version(self, aggregate_id: str) -> int:
+        return self._event_store.version(aggregate_id)
+
+    async def load(self, aggregate: _A, aggregate_id: str) -> _A:
+        if aggregate.version() == 0:
+            snapshot = await self._snapshot_store.latest(aggregate_id)
+            snapshot_version = 0
+            if snapshot is not None:
+                snapshot_version, data = snapshot
+                aggregate = cast(_A, self._serializer.deserialize(data))
+                aggregate._version = snapshot_version
+        else:
+            snapshot_version = await self._snapshot_store.latest_version(aggregate_id)
+        aggregate = await super().load(aggregate, aggregate_id)
+        if self._policy.should_snapshot(snapshot_version, aggregate.version()):
+            await self.snapshot(aggregate, aggregate_id)
+        return aggregate
+
+    async def snapshot(self, aggregate: EventSourcedAggregateRoot, aggregate_id: str) -> None:
+        await self._snapshot_store.save(aggregate_id, aggregate.version(), self._serializer.serialize(aggregate))
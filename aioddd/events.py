@@ -1,17 +1,132 @@
 from abc import ABC, abstractmethod
-from calendar import timegm
-from dataclasses import asdict, dataclass, field
-from datetime import datetime
-from typing import Any, Dict, List, Type, Union
+from asyncio import (
+    AbstractEventLoop,
+    Lock,
+    Queue,
+    QueueFull,
+    Semaphore,
+    StreamReader,
+    StreamWriter,
+    Task,
+    TimerHandle,
+    create_task,
+    gather,
+    get_running_loop,
+    new_event_loop,
+    wait_for,
+)
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import partial
+from inspect import unwrap
+from json import dumps, loads
+from logging import getLogger
+from multiprocessing.context import BaseContext
+from operator import attrgetter
+from random import getrandbits
+from time import perf_counter, time, time_ns
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
 from uuid import uuid4
 
-from .errors import EventMapperNotFoundError
-
-
+from .errors import (
+    EventMapperAlreadyRegisteredError,
+    EventMapperNotFoundError,
+    EventNotHandledError,
+    EventNotPublishedError,
+)
+from .metrics import HandlerMetrics
+from .middlewares import Middleware, compose_middlewares
+from .offload import ThreadOffload
+from .utils import _settle
+
+_T = TypeVar('_T')
+
+
+def _update_class_cells(old_cls: type, new_cls: type) -> None:
+    """Point the __class__ cells of the methods (used by zero-argument super()) to the rebuilt class."""
+    for member in new_cls.__dict__.values():
+        member = unwrap(member.__func__ if isinstance(member, (classmethod, staticmethod)) else member)
+        functions = (member.fget, member.fset, member.fdel) if isinstance(member, property) else (member,)
+        for function in functions:
+            for cell in getattr(function, '__closure__', None) or ():
+                try:
+                    if cell.cell_contents is old_cls:
+                        cell.cell_contents = new_cls
+                except ValueError:  # empty cell
+                    continue
+
+
+def _slotted(cls: Type[_T], weakref_slot: bool) -> Type[_T]:
+    if '__dataclass_fields__' not in cls.__dict__:  # not a dataclass yet or only inheriting from one
+        cls = dataclass(cls)
+    if '__slots__' in cls.__dict__:
+        return cls
+    inherited: Set[str] = set()
+    for base in cls.__mro__[1:]:
+        slots = base.__dict__.get('__slots__', ())
+        inherited.update((slots,) if isinstance(slots, str) else slots)
+    names = tuple(field_.name for field_ in fields(cls) if field_.name not in inherited)  # type: ignore
+    body = {key: value for key, value in cls.__dict__.items() if key not in (*names, '__dict__', '__weakref__')}
+    if weakref_slot and '__weakref__' not in inherited:
+        names += ('__weakref__',)
+    body['__slots__'] = names
+    metaclass: Any = type(cls)
+    slotted_cls: Type[_T] = metaclass(cls.__name__, cls.__bases__, body)
+    slotted_cls.__qualname__ = cls.__qualname__
+    _update_class_cells(cls, slotted_cls)
+    return slotted_cls
+
+
+@overload
+def slotted(cls: Type[_T]) -> Type[_T]:
+    pass  # pragma: no cover
+
+
+@overload
+def slotted(*, weakref_slot: bool = False) -> Callable[[Type[_T]], Type[_T]]:
+    pass  # pragma: no cover
+
+
+def slotted(
+    cls: Optional[Type[_T]] = None, *, weakref_slot: bool = False
+) -> Union[Type[_T], Callable[[Type[_T]], Type[_T]]]:
+    """
+    Rebuild a dataclass with __slots__ for its fields so instances do not carry a __dict__.
+
+    Classes that are not dataclasses yet are turned into one first. Fields already slotted by a base class
+    are not slotted again, so Event subclasses only redefining attributes just get empty __slots__.
+    Instances can not be weak referenced unless weakref_slot is given (use @slotted(weakref_slot=True)).
+    """
+    if cls is None:
+        return lambda cls_: _slotted(cls_, weakref_slot)
+    return _slotted(cls, weakref_slot)
+
+
+@slotted(weakref_slot=True)
 @dataclass
 class Event:
     """Class for keeping track of an Event."""
 
+    @slotted
     @dataclass
     class Attributes:
         """Class for keeping track of an Attributes of Event."""
@@ -26,13 +141,139 @@ class Event:
         occurred_on: int
 
     attributes: Attributes = field(default_factory=lambda: Event.Attributes())
-    meta: Meta = field(
-        default_factory=lambda: Event.Meta(
-            id=str(uuid4()),
-            type='event',
-            occurred_on=timegm(datetime.utcnow().utctimetuple()),
-        )
-    )
+    meta: Meta = field(default_factory=lambda: _event_meta_factory())
+
+
+def generate_uuid4_id() -> str:
+    return str(uuid4())
+
+
+class MonotonicIdGenerator:
+    """
+    Time sortable ids with the UUIDv7 layout (valid UUID strings).
+
+    The first 48 bits are the unix time in milliseconds followed by a 12 bits counter, so ids generated
+    by the same generator within the same millisecond are still strictly increasing.
+    """
+
+    __slots__ = ('_last_ms', '_counter')
+
+    def __init__(self) -> None:
+        self._last_ms = 0
+        self._counter = 0
+
+    def __call__(self) -> str:
+        ms = time_ns() // 1_000_000
+        if ms > self._last_ms:
+            self._last_ms = ms
+            self._counter = 0
+        else:
+            self._counter += 1
+            if self._counter > 0xFFF:
+                self._last_ms += 1
+                self._counter = 0
+        value = (self._last_ms << 80) | 0x7000 << 64 | self._counter << 64 | 0x8 << 60 | getrandbits(62)
+        hex_ = '%032x' % value
+        return f'{hex_[:8]}-{hex_[8:12]}-{hex_[12:16]}-{hex_[16:20]}-{hex_[20:]}'
+
+
+def seconds_clock() -> int:
+    return int(time())
+
+
+def milliseconds_clock() -> int:
+    return time_ns() // 1_000_000
+
+
+def nanoseconds_clock() -> int:
+    return time_ns()
+
+
+class EventMetaFactory:
+    """Creates the default Event.Meta of new events from an id generator and an occurred_on clock."""
+
+    __slots__ = ('_id_generator', '_clock', '_type')
+
+    def __init__(
+        self,
+        id_generator: Callable[[], str] = generate_uuid4_id,
+        clock: Callable[[], int] = seconds_clock,
+        type_: str = 'event',
+    ) -> None:
+        self._id_generator = id_generator
+        self._clock = clock
+        self._type = type_
+
+    def __call__(self) -> Event.Meta:
+        return Event.Meta(self._id_generator(), self._type, self._clock())
+
+
+_event_meta_factory: Callable[[], Event.Meta] = EventMetaFactory()
+
+
+def set_event_meta_factory(factory: Optional[Callable[[], Event.Meta]] = None) -> None:
+    """Replace the factory of the default Event.Meta (the uuid4 and seconds one if none given)."""
+    global _event_meta_factory
+    _event_meta_factory = factory or EventMetaFactory()
+
+
+_ATOMIC_TYPES = frozenset({type(None), bool, int, float, complex, str, bytes})
+_dataclass_encoders: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_event_decoders: Dict[Type[Event], Callable[[Dict[str, Any]], Event]] = {}
+
+
+def _encode_value(value: Any) -> Any:
+    """Same output as dataclasses.asdict inner conversion but using compiled encoders for dataclasses."""
+    cls = type(value)
+    if cls in _ATOMIC_TYPES:
+        return value
+    encoder = _dataclass_encoders.get(cls)
+    if encoder is not None:
+        return encoder(value)
+    if hasattr(cls, '__dataclass_fields__'):
+        return _compile_dataclass_encoder(cls)(value)
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return cls(*[_encode_value(item) for item in value])
+    if isinstance(value, (list, tuple)):
+        return cls(_encode_value(item) for item in value)
+    if isinstance(value, dict):
+        items = ((_encode_value(key), _encode_value(item)) for key, item in value.items())
+        return cls(value.default_factory, items) if hasattr(cls, 'default_factory') else cls(items)  # type: ignore
+    return deepcopy(value)
+
+
+def _compile_dataclass_encoder(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    names = tuple(field_.name for field_ in fields(cls))
+    values = attrgetter(*names) if len(names) > 1 else None
+
+    def encoder(obj: Any) -> Dict[str, Any]:
+        if values:
+            return dict(zip(names, map(_encode_value, values(obj))))
+        return {name: _encode_value(getattr(obj, name)) for name in names}
+
+    _dataclass_encoders[cls] = encoder
+    return encoder
+
+
+def _asdict(obj: Any) -> Dict[str, Any]:
+    encoder = _dataclass_encoders.get(type(obj))
+    return encoder(obj) if encoder else _compile_dataclass_encoder(type(obj))(obj)
+
+
+def _compile_event_decoder(event_type: Type[Event]) -> Callable[[Dict[str, Any]], Event]:
+    attributes_type = event_type.Attributes
+    meta_type = event_type.Meta
+    positional_meta = tuple(field_.name for field_ in fields(meta_type) if field_.init) == ('id', 'type', 'occurred_on')
+
+    def decoder(data: Dict[str, Any]) -> Event:
+        if positional_meta:
+            meta = meta_type(data['id'], data['type'], data['occurred_on'])
+        else:
+            meta = meta_type(id=data['id'], type=data['type'], occurred_on=data['occurred_on'])
+        return event_type(attributes=attributes_type(**data['attributes']), meta=meta)
+
+    _event_decoders[event_type] = decoder
+    return decoder
 
 
 class EventMapper:
@@ -47,29 +288,47 @@ class EventMapper:
 
     def encode(self, msg: Event) -> Dict[str, Any]:
         return {
-            **asdict(msg.meta),
+            **_asdict(msg.meta),
             'attributes': self.map_attributes(msg.attributes),
             'meta': {'message': f'{self.service_name}.{self.event_name}'},
         }
 
     def decode(self, data: Dict[str, Any]) -> Event:
-        attributes = self.event_type.Attributes(**data['attributes'])
-        meta = self.event_type.Meta(id=data['id'], type=data['type'], occurred_on=data['occurred_on'])
-        return self.event_type(attributes=attributes, meta=meta)
+        decoder = _event_decoders.get(self.event_type)
+        return decoder(data) if decoder else _compile_event_decoder(self.event_type)(data)
+
+    def encode_many(self, msgs: Iterable[Event]) -> List[Dict[str, Any]]:
+        return [self.encode(msg) for msg in msgs]
+
+    def decode_many(self, items: Iterable[Dict[str, Any]]) -> List[Event]:
+        return [self.decode(data) for data in items]
 
     @staticmethod
     def map_attributes(attributes: Event.Attributes) -> Dict[str, Any]:
-        return asdict(attributes)
+        return _asdict(attributes)
 
 
-def find_event_mapper_by_name(name: str, mappers: List[EventMapper]) -> EventMapper:
+async def _aiter(items: Union[Iterable[_T], AsyncIterable[_T]]) -> AsyncIterator[_T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def find_event_mapper_by_name(name: str, mappers: Union[List[EventMapper], 'ConfigEventMappers']) -> EventMapper:
+    if isinstance(mappers, ConfigEventMappers):
+        return mappers.find_by_name(name)
     for mapper in mappers:
         if f'{mapper.service_name}.{mapper.event_name}' == name:
             return mapper
     raise EventMapperNotFoundError.create(detail={'name': name})
 
 
-def find_event_mapper_by_type(msg: Event, mappers: List[EventMapper]) -> EventMapper:
+def find_event_mapper_by_type(msg: Event, mappers: Union[List[EventMapper], 'ConfigEventMappers']) -> EventMapper:
+    if isinstance(mappers, ConfigEventMappers):
+        return mappers.find_by_type(msg)
     for mapper in mappers:
         if mapper.belongs_to(msg):
             return mapper
@@ -77,21 +336,125 @@ def find_event_mapper_by_type(msg: Event, mappers: List[EventMapper]) -> EventMa
 
 
 class ConfigEventMappers:
+    """Registry of event mappers indexed by message name and event type."""
+
     _mappers: List[EventMapper]
+    _by_name: Dict[str, EventMapper]
+    _by_type: Dict[Type[Event], EventMapper]
+    _resolved: Dict[Type[Event], Optional[EventMapper]]
 
     def __init__(self, mappers: List[EventMapper]) -> None:
-        self._mappers = mappers
+        self._mappers = []
+        self._by_name = {}
+        self._by_type = {}
+        self._resolved = {}
+        self.add(mappers)
 
     def add(self, mappers: Union[EventMapper, List[EventMapper]]) -> None:
         if isinstance(mappers, EventMapper):
-            self._mappers.append(mappers)
-        elif isinstance(mappers, list):
-            for mapper in mappers:
-                self._mappers.append(mapper)
+            mappers = [mappers]
+        elif not isinstance(mappers, list):
+            return
+        names: Dict[str, EventMapper] = {}
+        for mapper in mappers:
+            service_name = getattr(mapper, 'service_name', None)
+            event_name = getattr(mapper, 'event_name', None)
+            if service_name is not None and event_name is not None:
+                name = f'{service_name}.{event_name}'
+                if name in self._by_name or name in names:
+                    raise EventMapperAlreadyRegisteredError.create(detail={'name': name})
+                names[name] = mapper
+        self._by_name.update(names)
+        for mapper in mappers:
+            event_type = getattr(mapper, 'event_type', None)
+            if event_type is not None:
+                self._by_type.setdefault(event_type, mapper)
+            self._mappers.append(mapper)
+        self._resolved.clear()
 
     def all(self) -> List[EventMapper]:
         return self._mappers
 
+    def find_by_name(self, name: str) -> EventMapper:
+        mapper = self._by_name.get(name)
+        if mapper is None:
+            raise EventMapperNotFoundError.create(detail={'name': name})
+        return mapper
+
+    def find_by_type(self, msg: Union[Event, Type[Event]]) -> EventMapper:
+        event_type = msg if isinstance(msg, type) else msg.__class__
+        try:
+            mapper = self._resolved[event_type]
+        except KeyError:
+            mapper = self._resolved[event_type] = next(
+                (self._by_type[base] for base in event_type.__mro__ if base in self._by_type), None
+            )
+        if mapper is None:
+            raise EventMapperNotFoundError.create(detail={'type': str(event_type)})
+        return mapper
+
+    def encode_many(self, msgs: Iterable[Event]) -> List[Dict[str, Any]]:
+        """Encode events of any registered type resolving the mapper once per event type."""
+        mappers: Dict[Type[Event], EventMapper] = {}
+        encoded = []
+        for msg in msgs:
+            mapper = mappers.get(msg.__class__)
+            if mapper is None:
+                mapper = mappers[msg.__class__] = self.find_by_type(msg)
+            encoded.append(mapper.encode(msg))
+        return encoded
+
+    def decode_many(self, items: Iterable[Dict[str, Any]]) -> List[Event]:
+        """Decode encoded events of any registered type resolving the mapper once per message name."""
+        mappers: Dict[str, EventMapper] = {}
+        decoded = []
+        for data in items:
+            name = data['meta']['message']
+            mapper = mappers.get(name)
+            if mapper is None:
+                mapper = mappers[name] = self.find_by_name(name)
+            decoded.append(mapper.decode(data))
+        return decoded
+
+    async def encode_stream(
+        self,
+        msgs: Union[Iterable[Event], AsyncIterable[Event]],
+        stream: Union[StreamWriter, BinaryIO],
+        *,
+        drain_every: int = 1000,
+    ) -> int:
+        """Write events as newline-delimited JSON into a byte stream or file, return the number of events written."""
+        mappers: Dict[Type[Event], EventMapper] = {}
+        drain = getattr(stream, 'drain', None)
+        written = 0
+        async for msg in _aiter(msgs):
+            mapper = mappers.get(msg.__class__)
+            if mapper is None:
+                mapper = mappers[msg.__class__] = self.find_by_type(msg)
+            stream.write(dumps(mapper.encode(msg), separators=(',', ':')).encode() + b'\n')
+            written += 1
+            if drain and written % drain_every == 0:
+                await drain()
+        if drain:
+            await drain()
+        return written
+
+    async def decode_stream(
+        self,
+        stream: Union[StreamReader, BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+    ) -> AsyncIterator[Event]:
+        """Read newline-delimited JSON events from a byte stream or file one line at a time."""
+        mappers: Dict[str, EventMapper] = {}
+        async for line in _aiter(stream):
+            if not line.strip():
+                continue
+            data = loads(line)
+            name = data['meta']['message']
+            mapper = mappers.get(name)
+            if mapper is None:
+                mapper = mappers[name] = self.find_by_name(name)
+            yield mapper.decode(data)
+
 
 class EventPublisher(ABC):
     @abstractmethod
@@ -100,10 +463,29 @@ class EventPublisher(ABC):
 
 
 class EventPublishers(EventPublisher):
-    _publishers: List[EventPublisher]
+    """
+    Publishes events through every publisher.
+
+    By default, publishers are awaited one after another and the first failure is propagated.
+    When concurrent, all publishers run at the same time, a failing one does not prevent the others from publishing,
+    and an EventNotPublishedError reporting the succeeded and failed publishers is raised afterwards.
+    timeout (seconds) bounds every single publisher.
+    """
 
-    def __init__(self, publishers: List[EventPublisher]) -> None:
+    _publishers: List[EventPublisher]
+    _concurrent: bool
+    _timeout: Optional[float]
+
+    def __init__(
+        self,
+        publishers: List[EventPublisher],
+        *,
+        concurrent: bool = False,
+        timeout: Optional[float] = None,
+    ) -> None:
         self._publishers = publishers
+        self._concurrent = concurrent
+        self._timeout = timeout
 
     def add(self, publishers: Union[EventPublisher, List[EventPublisher]]) -> None:
         if not isinstance(publishers, list):
@@ -111,9 +493,143 @@ class EventPublishers(EventPublisher):
         for publisher in publishers:
             self._publishers.append(publisher)
 
-    async def publish(self, events: List[Event]) -> None:
-        for publisher in self._publishers:
+    async def _publish(self, publisher: EventPublisher, events: List[Event]) -> None:
+        if self._timeout is None:
             await publisher.publish(events)
+        else:
+            await wait_for(publisher.publish(events), self._timeout)
+
+    async def publish_with_results(self, events: List[Event]) -> List[Tuple[EventPublisher, Optional[Exception]]]:
+        """Publish through every publisher isolating failures and return each publisher with its error (if any)."""
+        results: List[Union[None, BaseException]]
+        if self._concurrent:
+            results = await gather(
+                *[self._publish(publisher, events) for publisher in self._publishers], return_exceptions=True
+            )
+        else:
+            results = []
+            for publisher in self._publishers:
+                try:
+                    await self._publish(publisher, events)
+                    results.append(None)
+                except Exception as err:  # pylint: disable=broad-except
+                    results.append(err)
+        for result in results:
+            if result is not None and not isinstance(result, Exception):
+                raise result
+        return [(publisher, cast(Optional[Exception], result)) for publisher, result in zip(self._publishers, results)]
+
+    async def publish(self, events: List[Event]) -> None:
+        if not self._concurrent:
+            for publisher in self._publishers:
+                await self._publish(publisher, events)
+            return
+        results = await self.publish_with_results(events)
+        if any(err is not None for _, err in results):
+            raise EventNotPublishedError.create(
+                detail={
+                    'succeeded': [publisher.__class__.__name__ for publisher, err in results if err is None],
+                    'failed': [
+                        {'publisher': publisher.__class__.__name__, 'exception': repr(err)}
+                        for publisher, err in results
+                        if err is not None
+                    ],
+                }
+            )
+
+
+class BufferedEventPublisher(EventPublisher):
+    """
+    Collects published events and forwards them in batches to another publisher.
+
+    Events are flushed when max_batch_size events are buffered (awaited by that publish call) or max_linger seconds
+    after the first buffered event (in background). Delivery is at least once: a failed batch stays buffered and
+    is retried max_linger seconds later (or by the next flush), so publish does not raise for it, the failure is
+    given to on_error (logged by default). flush and close raise it instead, the batch staying buffered as well.
+    Call close on shutdown to flush the remaining events.
+    """
+
+    _publisher: EventPublisher
+    _max_batch_size: int
+    _max_linger: float
+    _on_error: Optional[Callable[[List[Event], Exception], None]]
+    _buffer: List[Event]
+    _timer: Optional[TimerHandle]
+    _background: Set['Task[None]']
+    _lock: Optional[Lock]
+    _closed: bool
+
+    def __init__(
+        self,
+        publisher: EventPublisher,
+        *,
+        max_batch_size: int = 100,
+        max_linger: float = 0.1,
+        on_error: Optional[Callable[[List[Event], Exception], None]] = None,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError('"max_batch_size" must be greater than 0')
+        self._publisher = publisher
+        self._max_batch_size = max_batch_size
+        self._max_linger = max_linger
+        self._on_error = on_error
+        self._buffer = []
+        self._timer = None
+        self._background = set()
+        self._lock = None
+        self._closed = False
+
+    async def publish(self, events: List[Event]) -> None:
+        if self._closed:
+            raise EventNotPublishedError.create(detail={'reason': 'closed'})
+        self._buffer.extend(events)
+        if len(self._buffer) >= self._max_batch_size:
+            await self._forward(raise_errors=False)
+        elif self._buffer:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is None and not self._closed:
+            self._timer = get_running_loop().call_later(self._max_linger, self._flush_in_background)
+
+    def _flush_in_background(self) -> None:
+        self._timer = None
+        task = create_task(self._forward(raise_errors=False))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _forward(self, raise_errors: bool) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._lock is None:
+            self._lock = Lock()
+        async with self._lock:
+            while self._buffer:
+                batch = self._buffer[: self._max_batch_size]
+                del self._buffer[: self._max_batch_size]
+                try:
+                    await self._publisher.publish(batch)
+                except BaseException as err:  # pylint: disable=broad-except
+                    self._buffer[:0] = batch
+                    self._schedule()
+                    if raise_errors or not isinstance(err, Exception):
+                        raise
+                    if self._on_error:
+                        self._on_error(batch, err)
+                    else:
+                        getLogger(__name__).exception('Events could not be published')
+                    return
+
+    async def flush(self) -> None:
+        """Forward every buffered event now, in batches of at most max_batch_size."""
+        await self._forward(raise_errors=True)
+
+    async def close(self) -> None:
+        """Stop accepting events and flush the buffered ones."""
+        self._closed = True
+        await gather(*self._background, return_exceptions=True)
+        await self.flush()
 
 
 class EventHandler(ABC):
@@ -125,6 +641,10 @@ class EventHandler(ABC):
     async def handle(self, events: List[Event]) -> None:
         pass  # pragma: no cover
 
+    def max_batch_size(self) -> Optional[int]:
+        """Maximum number of events given to handle at once when the bus delivers them batched (None = unbounded)."""
+        return None
+
 
 class EventBus(ABC):
     @abstractmethod
@@ -132,24 +652,359 @@ class EventBus(ABC):
         pass  # pragma: no cover
 
 
+_EventDelivery = Tuple[EventHandler, List[Event]]
+
+
 class SimpleEventBus(EventBus):
-    _handlers: List[EventHandler]
+    """
+    Event bus notifying every handler subscribed to the type (or a base type) of each event.
+
+    By default, handlers are awaited one after another with one event each and the first failure is propagated.
+    When batched, each handler receives all its matching events of a notify call at once, in their original order,
+    split according to its max_batch_size.
+    When concurrency is given, deliveries run concurrently (at most concurrency at the same time)
+    and all failures are collected into a single EventNotHandledError once every delivery has finished.
+    The ordering option decides whether deliveries are still made one event (or batch) after another ('event')
+    or all of them may run at the same time ('none').
+    Middlewares wrap every notify call with the list of events, see compose_middlewares.
+    Handler calls are recorded in metrics, if given, and blocking handlers run in the offload thread pool, if given.
+    """
 
-    def __init__(self, handlers: List[EventHandler]):
-        self._handlers = handlers
+    _handlers: List[EventHandler]
+    _index: Dict[Type[Event], List[Tuple[int, EventHandler]]]
+    _resolved: Dict[Type[Event], List[EventHandler]]
+    _concurrency: Optional[int]
+    _ordering: str
+    _batched: bool
+    _middlewares: List[Middleware]
+    _metrics: Optional[HandlerMetrics]
+    _offload: Optional[ThreadOffload]
+
+    def __init__(
+        self,
+        handlers: List[EventHandler],
+        *,
+        concurrency: Optional[int] = None,
+        ordering: str = 'event',
+        batched: bool = False,
+        middlewares: Optional[List[Middleware]] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        offload: Optional[ThreadOffload] = None,
+    ) -> None:
+        if concurrency is not None and concurrency < 1:
+            raise ValueError('"concurrency" must be greater than 0')
+        if ordering not in ('event', 'none'):
+            raise ValueError('"ordering" must be one of: event, none')
+        self._handlers = []
+        self._index = {}
+        self._resolved = {}
+        self._concurrency = concurrency
+        self._ordering = ordering
+        self._batched = batched
+        self._middlewares = []
+        self._metrics = metrics
+        self._offload = offload
+        self.add_handler(handlers)
+        if middlewares:
+            self.add_middleware(middlewares)
 
     def add_handler(self, handler: Union[EventHandler, List[EventHandler]]) -> None:
         if not isinstance(handler, list):
             handler = [handler]
         for handler_ in handler:
+            if self._offload:
+                handler_ = self._offload.wrap(handler_)
+            if self._metrics:
+                handler_ = self._metrics.instrument(handler_, 'event')
+            position = len(self._handlers)
             self._handlers.append(handler_)
+            for event_type in handler_.subscribed_to():
+                self._index.setdefault(event_type, []).append((position, handler_))
+        self._resolved.clear()
+
+    def add_middleware(self, middleware: Union[Middleware, List[Middleware]]) -> None:
+        self._middlewares += middleware if isinstance(middleware, list) else [middleware]
+        pipeline = compose_middlewares(self._middlewares, partial(type(self).notify, self))
+
+        def notify(events: List[Event]) -> Awaitable[None]:
+            return pipeline(events)
+
+        self.notify = notify  # type: ignore
+
+    def _resolve_handlers(self, event_type: Type[Event]) -> List[EventHandler]:
+        """Resolve (and cache) the handlers of a concrete event class walking its MRO in registration order."""
+        handlers = self._resolved.get(event_type)
+        if handlers is None:
+            matches = [match for base in event_type.__mro__ for match in self._index.get(base, ())]
+            handlers = self._resolved[event_type] = [handler for _, handler in sorted(matches, key=lambda m: m[0])]
+        return handlers
+
+    def _waves(self, events: List[Event]) -> List[List[_EventDelivery]]:
+        """Group the deliveries of a notify call in waves, each one depending on the previous one to keep order."""
+        if not self._batched:
+            return [[(handler, [event]) for handler in self._resolve_handlers(event.__class__)] for event in events]
+        batches: Dict[int, _EventDelivery] = {}
+        for event in events:
+            for handler in self._resolve_handlers(event.__class__):
+                batch = batches.setdefault(id(handler), (handler, []))[1]
+                if not batch or batch[-1] is not event:
+                    batch.append(event)
+        waves: List[List[_EventDelivery]] = []
+        for handler, batch in batches.values():
+            size = handler.max_batch_size() or len(batch)
+            for wave, offset in enumerate(range(0, len(batch), size)):
+                if wave == len(waves):
+                    waves.append([])
+                waves[wave].append((handler, batch[offset : offset + size]))
+        return waves
 
     async def notify(self, events: List[Event]) -> None:
-        for event in events:
-            for handler in self._handlers:
-                for event_type in handler.subscribed_to():
-                    if isinstance(event, event_type):
-                        await handler.handle([event])
+        waves = self._waves(events)
+        if self._concurrency is None:
+            for wave in waves:
+                for handler, batch in wave:
+                    await handler.handle(batch)
+            return
+        semaphore = Semaphore(self._concurrency)
+        failures: List[Tuple[EventHandler, List[Event], BaseException]] = []
+        if self._ordering == 'event':
+            for wave in waves:
+                failures += await self._fan_out(semaphore, wave)
+        else:
+            failures += await self._fan_out(semaphore, [delivery for wave in waves for delivery in wave])
+        if failures:
+            raise self._not_handled_error(failures)
+
+    @staticmethod
+    def _not_handled_error(failures: List[Tuple[EventHandler, List[Event], BaseException]]) -> EventNotHandledError:
+        error = EventNotHandledError.create(
+            detail={
+                'failures': [
+                    {
+                        'events': [event.__class__.__name__ for event in batch],
+                        'handler': handler.__class__.__name__,
+                        'exception': str(err),
+                    }
+                    for handler, batch, err in failures
+                ]
+            }
+        )
+        return cast(EventNotHandledError, error).with_errors([err for _, _, err in failures])
+
+    @staticmethod
+    async def _fan_out(
+        semaphore: Semaphore,
+        deliveries: List[_EventDelivery],
+    ) -> List[Tuple[EventHandler, List[Event], BaseException]]:
+        async def _deliver(handler: EventHandler, batch: List[Event]) -> None:
+            async with semaphore:
+                await handler.handle(batch)
+
+        results = await gather(*[_deliver(handler, batch) for handler, batch in deliveries], return_exceptions=True)
+        return [
+            (handler, batch, result)
+            for (handler, batch), result in zip(deliveries, results)
+            if isinstance(result, BaseException)
+        ]
+
+
+_process_worker_mappers: Optional[ConfigEventMappers] = None
+_process_worker_loop: Optional[AbstractEventLoop] = None
+
+
+def _init_process_worker(mappers: ConfigEventMappers) -> None:
+    global _process_worker_mappers
+    _process_worker_mappers = mappers
+
+
+def _handle_in_process(handler: EventHandler, encoded: List[Dict[str, Any]]) -> None:
+    global _process_worker_loop
+    if _process_worker_loop is None:
+        _process_worker_loop = new_event_loop()
+    events = cast(ConfigEventMappers, _process_worker_mappers).decode_many(encoded)
+    _process_worker_loop.run_until_complete(handler.handle(events))
+
+
+class ProcessPoolEventBus(SimpleEventBus):
+    """
+    Event bus running handlers in a process pool, for CPU bound handlers that would block the event loop.
+
+    Matching events are grouped per handler (see EventHandler.max_batch_size), encoded through the event mappers
+    and handled in worker processes, so handlers, mappers and their classes must be picklable/importable.
+    The mappers are sent once to each worker process when the pool starts (on first notify).
+    Every delivery runs concurrently and failures are collected into a single EventNotHandledError.
+    """
+
+    _mappers: ConfigEventMappers
+    _max_workers: Optional[int]
+    _mp_context: Optional[BaseContext]
+    _executor: Optional[ProcessPoolExecutor]
+
+    def __init__(
+        self,
+        handlers: List[EventHandler],
+        mappers: ConfigEventMappers,
+        *,
+        max_workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        super().__init__(handlers, batched=True)
+        self._mappers = mappers
+        self._max_workers = max_workers
+        self._mp_context = mp_context
+        self._executor = None
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=self._mp_context,
+                initializer=_init_process_worker,
+                initargs=(self._mappers,),
+            )
+        return self._executor
+
+    async def notify(self, events: List[Event]) -> None:
+        deliveries = [delivery for wave in self._waves(events) for delivery in wave]
+        if not deliveries:
+            return
+        executor = self._start()
+        loop = get_running_loop()
+        encoded: Dict[int, Dict[str, Any]] = {}
+        futures = []
+        for handler, batch in deliveries:
+            for event in batch:
+                if id(event) not in encoded:
+                    encoded[id(event)] = self._mappers.find_by_type(event).encode(event)
+            futures.append(
+                loop.run_in_executor(executor, _handle_in_process, handler, [encoded[id(event)] for event in batch])
+            )
+        results = await gather(*futures, return_exceptions=True)
+        failures = [
+            (handler, batch, result)
+            for (handler, batch), result in zip(deliveries, results)
+            if isinstance(result, BaseException)
+        ]
+        if failures:
+            raise self._not_handled_error(failures)
+
+    async def close(self) -> None:
+        """Wait for the running deliveries and stop the worker processes."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await get_running_loop().run_in_executor(None, executor.shutdown)
+
+
+class QueueEventBus(EventBus):
+    """
+    Event bus accepting events into a bounded queue and delivering them to another event bus from worker tasks.
+
+    notify returns as soon as the events are queued. When the queue is full, overflow decides whether notify
+    waits for room ('block'), discards the events ('drop') or raises EventNotPublishedError ('raise').
+    Delivery failures can not reach the notifier, so they are given to on_error (logged by default, and logged as
+    well when on_error raises).
+    """
+
+    _event_bus: EventBus
+    _workers_count: int
+    _max_size: int
+    _overflow: str
+    _on_error: Optional[Callable[[List[Event], BaseException], None]]
+    _queue: Optional['Queue[Tuple[float, List[Event]]]']
+    _workers: List['Task[None]']
+    _closed: bool
+    _stats: Dict[str, float]
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        *,
+        workers: int = 1,
+        max_size: int = 0,
+        overflow: str = 'block',
+        on_error: Optional[Callable[[List[Event], BaseException], None]] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError('"workers" must be greater than 0')
+        if overflow not in ('block', 'drop', 'raise'):
+            raise ValueError('"overflow" must be one of: block, drop, raise')
+        self._event_bus = event_bus
+        self._workers_count = workers
+        self._max_size = max_size
+        self._overflow = overflow
+        self._on_error = on_error
+        self._queue = None
+        self._workers = []
+        self._closed = False
+        self._stats = {'enqueued': 0, 'delivered': 0, 'dropped': 0, 'failed': 0, 'last_lag': 0.0, 'max_lag': 0.0}
+
+    def _start(self) -> 'Queue[Tuple[float, List[Event]]]':
+        if self._queue is None:
+            self._queue = Queue(self._max_size)
+            self._workers = [create_task(self._work(self._queue)) for _ in range(self._workers_count)]
+        return self._queue
+
+    async def notify(self, events: List[Event]) -> None:
+        if self._closed:
+            raise EventNotPublishedError.create(detail={'reason': 'closed'})
+        if not events:
+            return
+        queue = self._start()
+        item = (perf_counter(), events)
+        if self._overflow == 'block':
+            await queue.put(item)
+        else:
+            try:
+                queue.put_nowait(item)
+            except QueueFull:
+                if self._overflow == 'raise':
+                    raise EventNotPublishedError.create(detail={'reason': 'queue_full', 'max_size': self._max_size})
+                self._stats['dropped'] += len(events)
+                return
+        self._stats['enqueued'] += len(events)
+
+    async def _work(self, queue: 'Queue[Tuple[float, List[Event]]]') -> None:
+        while True:
+            enqueued_at, events = await queue.get()
+            lag = perf_counter() - enqueued_at
+            self._stats['last_lag'] = lag
+            self._stats['max_lag'] = max(self._stats['max_lag'], lag)
+            try:
+                _, err = await _settle(self._event_bus.notify(events))
+                if err is None:
+                    self._stats['delivered'] += len(events)
+                else:
+                    self._stats['failed'] += len(events)
+                    self._report(events, err)
+            finally:
+                queue.task_done()
+
+    def _report(self, events: List[Event], err: BaseException) -> None:
+        if self._on_error:
+            try:
+                self._on_error(events, err)
+                return
+            except Exception as on_error_err:  # pylint: disable=broad-except
+                getLogger(__name__).error('Delivery error handler failed', exc_info=on_error_err)
+        getLogger(__name__).error('Events could not be delivered', exc_info=err)
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been delivered."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Stop accepting events, deliver the queued ones and stop the workers."""
+        self._closed = True
+        await self.drain()
+        for worker in self._workers:
+            worker.cancel()
+        await gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth, event counters and delivery lag (seconds from notify to delivery start)."""
+        return {'depth': self._queue.qsize() if self._queue is not None else 0, **self._stats}
 
 
 class InternalEventPublisher(EventPublisher):
@@ -0,0 +1,140 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, cast
+
+_H = TypeVar('_H')
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# bus, handler name, message name
+_Labels = Tuple[str, str, str]
+
+
+class _Series:
+    __slots__ = ('count', 'errors', 'sum', 'buckets')
+
+    def __init__(self, buckets: int) -> None:
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.buckets = [0] * (buckets + 1)
+
+
+def _event_names(events: List[Any]) -> str:
+    names = {event.__class__.__name__ for event in events}
+    return names.pop() if len(names) == 1 else 'mixed'
+
+
+class _InstrumentedHandler:
+    __slots__ = ('_handler', '_metrics', '_bus', '_name', '_message_name')
+
+    def __init__(self, handler: Any, metrics: 'HandlerMetrics', bus: str) -> None:
+        self._handler = handler
+        self._metrics = metrics
+        self._bus = bus
+        self._name = handler.__class__.__name__
+        self._message_name: Callable[[Any], str] = (
+            _event_names if bus == 'event' else lambda msg: msg.__class__.__name__
+        )
+
+    def subscribed_to(self) -> Any:
+        return self._handler.subscribed_to()
+
+    def max_batch_size(self) -> Optional[int]:
+        return cast(Optional[int], self._handler.max_batch_size())
+
+    async def handle(self, msg: Any) -> Any:
+        failed = False
+        start = perf_counter()
+        try:
+            return await self._handler.handle(msg)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._metrics.observe(
+                (self._bus, self._name, self._message_name(msg)), perf_counter() - start, failed=failed
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class HandlerMetrics:
+    """
+    Call counts, error counts and latency histograms (seconds) per bus, handler and message type.
+
+    Give the same instance to the metrics option of the simple buses to record their handlers: they are wrapped
+    when registered, so buses without metrics are not affected at all. Batched event deliveries are recorded once,
+    under the event type of the batch ('mixed' when it holds several types).
+    """
+
+    _buckets: Tuple[float, ...]
+    _series: Dict[_Labels, _Series]
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def instrument(self, handler: _H, bus: str) -> _H:
+        """Wrap a command, query or event (bus) handler recording its calls."""
+        return _InstrumentedHandler(handler, self, bus)  # type: ignore
+
+    def observe(self, labels: _Labels, elapsed: float, *, failed: bool = False) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self._buckets))
+        series.count += 1
+        series.sum += elapsed
+        series.buckets[bisect_left(self._buckets, elapsed)] += 1
+        if failed:
+            series.errors += 1
+
+    def reset(self) -> None:
+        self._series.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """Recorded series by bus, handler and message name, with cumulative buckets by upper bound."""
+        result: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        for (bus, handler, message), series in sorted(self._series.items()):
+            result.setdefault(bus, {}).setdefault(handler, {})[message] = {
+                'count': series.count,
+                'errors': series.errors,
+                'sum': series.sum,
+                'buckets': dict(zip((*self._buckets, float('inf')), self._cumulative(series))),
+            }
+        return result
+
+    @staticmethod
+    def _cumulative(series: _Series) -> List[int]:
+        total, cumulative = 0, []
+        for count in series.buckets:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def prometheus(self, namespace: str = 'aioddd') -> str:
+        """Recorded series in the Prometheus text exposition format."""
+        calls = [
+            f'# HELP {namespace}_handler_calls_total Handler calls.',
+            f'# TYPE {namespace}_handler_calls_total counter',
+        ]
+        errors = [
+            f'# HELP {namespace}_handler_errors_total Handler calls raising an error.',
+            f'# TYPE {namespace}_handler_errors_total counter',
+        ]
+        durations = [
+            f'# HELP {namespace}_handler_duration_seconds Handler call duration.',
+            f'# TYPE {namespace}_handler_duration_seconds histogram',
+        ]
+        bounds = [repr(bound) for bound in self._buckets] + ['+Inf']
+        for (bus, handler, message), series in sorted(self._series.items()):
+            labels = f'bus="{_escape(bus)}",handler="{_escape(handler)}",message="{_escape(message)}"'
+            calls.append(f'{namespace}_handler_calls_total{{{labels}}} {series.count}')
+            errors.append(f'{namespace}_handler_errors_total{{{labels}}} {series.errors}')
+            for bound, count in zip(bounds, self._cumulative(series)):
+                durations.append(f'{namespace}_handler_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            durations.append(f'{namespace}_handler_duration_seconds_sum{{{labels}}} {series.sum!r}')
+            durations.append(f'{namespace}_handler_duration_seconds_count{{{labels}}} {series.count}')
+        return '\n'.join(calls + errors + durations) + '\n'
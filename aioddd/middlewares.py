@@ -0,0 +1,20 @@
+from typing import Any, Awaitable, Callable, List
+
+Next = Callable[[Any], Awaitable[Any]]
+Middleware = Callable[[Any, Next], Awaitable[Any]]
+
+
+def _link(middleware: Middleware, next_: Next) -> Next:
+    return lambda msg: middleware(msg, next_)
+
+
+def compose_middlewares(middlewares: List[Middleware], handler: Next) -> Next:
+    """
+    Chain middlewares around handler, the first one being the outermost.
+
+    Every middleware receives the message (command, query or list of events) and the next step of the chain,
+    and returns what awaiting it returned (or anything else).
+    """
+    for middleware in reversed(middlewares):
+        handler = _link(middleware, handler)
+    return handler
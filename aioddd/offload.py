@@ -0,0 +1,81 @@
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import copy_context
+from inspect import isawaitable, iscoroutinefunction
+from typing import Any, Callable, Optional, TypeVar, cast
+
+_F = TypeVar('_F', bound=Callable[..., Any])
+_H = TypeVar('_H')
+
+_BLOCKING_ATTR = '__aioddd_blocking__'
+
+
+def blocking(func: _F) -> _F:
+    """Mark the handle method of a handler as blocking, so buses with a ThreadOffload run it in a thread."""
+    setattr(func, _BLOCKING_ATTR, True)
+    return func
+
+
+class _OffloadedHandler:
+    __slots__ = ('_handler', '_offload')
+
+    def __init__(self, handler: Any, offload: 'ThreadOffload') -> None:
+        self._handler = handler
+        self._offload = offload
+
+    def subscribed_to(self) -> Any:
+        return self._handler.subscribed_to()
+
+    def max_batch_size(self) -> Optional[int]:
+        return cast(Optional[int], self._handler.max_batch_size())
+
+    async def handle(self, msg: Any) -> Any:
+        result = await get_running_loop().run_in_executor(
+            self._offload.executor(), copy_context().run, self._handler.handle, msg
+        )
+        if isawaitable(result):
+            result = await result
+        return result
+
+
+class ThreadOffload:
+    """
+    Runs blocking handlers in a thread pool instead of the event loop.
+
+    Give the same instance to the offload option of the simple buses: handlers whose handle method is marked
+    with @blocking, or (when detect) is not a coroutine function, are wrapped when registered to run in executor
+    (a ThreadPoolExecutor of max_workers threads by default) with a copy of the caller context, so contextvars
+    are propagated. Coroutine handlers keep running in the event loop.
+    """
+
+    _executor: Optional[Executor]
+    _max_workers: int
+    _detect: bool
+    _owned: bool
+
+    def __init__(self, *, max_workers: int = 4, executor: Optional[Executor] = None, detect: bool = True) -> None:
+        if max_workers < 1:
+            raise ValueError('"max_workers" must be greater than 0')
+        self._executor = executor
+        self._max_workers = max_workers
+        self._detect = detect
+        self._owned = executor is None
+
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='aioddd')
+        return self._executor
+
+    def is_blocking(self, handler: Any) -> bool:
+        handle = handler.handle
+        return getattr(handle, _BLOCKING_ATTR, False) or (self._detect and not iscoroutinefunction(handle))
+
+    def wrap(self, handler: _H) -> _H:
+        """Wrap a command, query or event handler to run in the thread pool if it is blocking."""
+        return cast(_H, _OffloadedHandler(handler, self)) if self.is_blocking(handler) else handler
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool created by this instance (a given executor is left to its owner)."""
+        if self._owned and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
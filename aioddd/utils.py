@@ -1,6 +1,19 @@
+from asyncio import CancelledError, current_task, ensure_future, wait
 from logging import NOTSET, Formatter, Logger, StreamHandler, getLogger
 from os import getenv
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union, cast
+from sys import version_info
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 
 def get_env(key: str, default: Optional[str] = None, cast_default_to_str: bool = True) -> Optional[str]:
@@ -84,3 +97,48 @@ def env(key: Optional[str] = None, typ: Optional[Type[_T]] = None) -> _T:
 
 
 env.resolver = lambda: {}  # type: ignore
+
+
+async def _catch_exit(awaitable: Awaitable[_T]) -> Tuple[Optional[_T], Optional[BaseException]]:
+    try:
+        return await awaitable, None
+    except (CancelledError, Exception):
+        raise
+    except BaseException as err:  # pylint: disable=broad-except
+        return None, err
+
+
+async def _settle(awaitable: Awaitable[_T]) -> Tuple[Optional[_T], Optional[BaseException]]:
+    """
+    Await awaitable returning its result or the Exception (or CancelledError) it raised.
+
+    Only the cancellation of the current task propagates, so workers can report a call raising CancelledError
+    as a failure of that call and keep running. KeyboardInterrupt, SystemExit and other BaseException are
+    re-raised in the current task. Before Python 3.11 (no Task.cancelling), the awaitable runs in its own task
+    to tell both cancellations apart.
+    """
+    if version_info >= (3, 11):
+        try:
+            return await awaitable, None
+        except CancelledError as err:
+            task = current_task()
+            if task is not None and task.cancelling():
+                raise
+            return None, err
+        except Exception as err:  # pylint: disable=broad-except
+            return None, err
+    inner = ensure_future(_catch_exit(awaitable))
+    try:
+        await wait((inner,))
+    except CancelledError:
+        inner.cancel()
+        raise
+    if inner.cancelled():
+        return None, CancelledError()
+    error = inner.exception()
+    if error is not None:
+        return None, error
+    result, exit_error = inner.result()
+    if exit_error is not None:
+        raise exit_error
+    return result, None
@@ -0,0 +1,10 @@
+from importlib import import_module
+from pkgutil import iter_modules
+
+from . import __path__ as _path
+
+if __name__ == '__main__':
+    for module in iter_modules(_path):
+        if not module.name.startswith('_'):
+            print(f'# {module.name}')
+            import_module(f'{__package__}.{module.name}').main()
@@ -0,0 +1,9 @@
+from timeit import repeat
+from typing import Callable
+
+
+def bench(name: str, func: Callable[[], object], number: int = 10_000, rounds: int = 5) -> float:
+    """Print and return the best time per call (in microseconds) of func."""
+    best = min(repeat(func, number=number, repeat=rounds)) / number * 1e6
+    print(f'{name:<48} {best:>10.2f} us/op')
+    return best
@@ -0,0 +1,82 @@
+from typing import Any, Awaitable, Callable, Coroutine, Type, cast
+
+from aioddd import (
+    Command,
+    CommandHandler,
+    HandlerMetrics,
+    Next,
+    Query,
+    QueryHandler,
+    SimpleCommandBus,
+    SimpleQueryBus,
+)
+
+from ._utils import bench
+
+
+class NoopCommand(Command):
+    pass
+
+
+class NoopCommandHandler(CommandHandler):
+    def subscribed_to(self) -> Type[Command]:
+        return NoopCommand
+
+    async def handle(self, command: Command) -> None:
+        pass
+
+
+class NoopQuery(Query):
+    pass
+
+
+class NoopQueryHandler(QueryHandler):
+    def subscribed_to(self) -> Type[Query]:
+        return NoopQuery
+
+    async def handle(self, query: Query) -> None:
+        pass
+
+
+async def passthrough(msg: Any, next_: Next) -> Any:
+    return await next_(msg)
+
+
+def _drive(call: Callable[[Any], Awaitable[Any]], msg: Any) -> Callable[[], None]:
+    """Run a coroutine that never suspends without an event loop, so only the dispatch path is measured."""
+
+    def run() -> None:
+        try:
+            cast(Coroutine[Any, Any, Any], call(msg)).send(None)
+        except StopIteration:
+            pass
+
+    return run
+
+
+def main() -> None:
+    command, query = NoopCommand(), NoopQuery()
+    handler = NoopCommandHandler()
+    number = 200_000
+
+    # without middlewares the buses keep their class dispatch/ask, so bare - reference is the same as before
+    direct = bench('command handler.handle (reference)', _drive(handler.handle, command), number=number)
+    plain = SimpleCommandBus([handler])
+    assert 'dispatch' not in vars(plain)
+    bare = bench('command bus dispatch (no middleware)', _drive(plain.dispatch, command), number=number)
+    wrapped = SimpleCommandBus([handler], middlewares=[passthrough])
+    one = bench('command bus dispatch (1 middleware)', _drive(wrapped.dispatch, command), number=number)
+    print(f'{"dispatch overhead over handle":<48} {bare - direct:>10.2f} us/op')
+    print(f'{"1 middleware overhead":<48} {one - bare:>10.2f} us/op')
+    measured = SimpleCommandBus([handler], metrics=HandlerMetrics())
+    recorded = bench('command bus dispatch (metrics)', _drive(measured.dispatch, command), number=number)
+    print(f'{"metrics overhead":<48} {recorded - bare:>10.2f} us/op')
+
+    plain_query = SimpleQueryBus([NoopQueryHandler()])
+    bench('query bus ask (no middleware)', _drive(plain_query.ask, query), number=number)
+    wrapped_query = SimpleQueryBus([NoopQueryHandler()], middlewares=[passthrough] * 3)
+    bench('query bus ask (3 middlewares)', _drive(wrapped_query.ask, query), number=number)
+
+
+if __name__ == '__main__':
+    main()
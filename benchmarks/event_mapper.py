@@ -0,0 +1,82 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+from aioddd import Event, EventMapper
+
+from ._utils import bench
+
+
+@dataclass
+class _Line:
+    sku: str
+    quantity: int
+    price: float
+    tags: List[str]
+
+
+@dataclass
+class _Address:
+    street: str
+    city: str
+    zip_code: str
+
+
+class OrderPlaced(Event):
+    @dataclass
+    class Attributes:
+        order_id: str
+        customer_id: str
+        shipping: _Address
+        billing: _Address
+        lines: List[_Line]
+        total: float
+
+    attributes: Attributes
+
+
+class OrderPlacedMapper(EventMapper):
+    event_type = OrderPlaced
+    service_name = 'orders'
+    event_name = 'order_placed'
+
+
+def _legacy_encode(mapper: EventMapper, msg: Event) -> Dict[str, Any]:
+    return {
+        **asdict(msg.meta),
+        'attributes': asdict(msg.attributes),
+        'meta': {'message': f'{mapper.service_name}.{mapper.event_name}'},
+    }
+
+
+def _legacy_decode(mapper: EventMapper, data: Dict[str, Any]) -> Event:
+    attributes = mapper.event_type.Attributes(**data['attributes'])
+    meta = mapper.event_type.Meta(id=data['id'], type=data['type'], occurred_on=data['occurred_on'])
+    return mapper.event_type(attributes=attributes, meta=meta)
+
+
+def main() -> None:
+    address = _Address(street='Main St 1', city='Barcelona', zip_code='08001')
+    event = OrderPlaced(
+        attributes=OrderPlaced.Attributes(
+            order_id='order',
+            customer_id='customer',
+            shipping=address,
+            billing=address,
+            lines=[_Line(sku=f'sku-{i}', quantity=i, price=i * 1.5, tags=['a', 'b']) for i in range(5)],
+            total=100.0,
+        )
+    )
+    mapper = OrderPlacedMapper()
+    data = mapper.encode(event)
+    assert data == _legacy_encode(mapper, event)
+
+    legacy = bench('encode (dataclasses.asdict)', lambda: _legacy_encode(mapper, event))
+    current = bench('encode (compiled)', lambda: mapper.encode(event))
+    print(f'{"encode speedup":<48} {legacy / current:>10.2f} x')
+    legacy = bench('decode (keyword unpacking)', lambda: _legacy_decode(mapper, data))
+    current = bench('decode (compiled)', lambda: mapper.decode(data))
+    print(f'{"decode speedup":<48} {legacy / current:>10.2f} x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable, List
+
+from aioddd import Event, slotted
+
+_EVENTS = 10_000
+
+
+@dataclass
+class _LegacyEvent:
+    @dataclass
+    class Attributes:
+        pass
+
+    attributes: Attributes = field(default_factory=lambda: _LegacyEvent.Attributes())
+    meta: Event.Meta = field(default_factory=lambda: Event.Meta(id='id', type='event', occurred_on=0))
+
+
+class LegacyOrderPlaced(_LegacyEvent):
+    @dataclass
+    class Attributes:
+        order_id: str
+        customer_id: str
+        total: float
+
+    attributes: Attributes
+
+
+class OrderPlaced(Event):
+    @dataclass
+    class Attributes:
+        order_id: str
+        customer_id: str
+        total: float
+
+    attributes: Attributes
+
+
+@slotted
+class SlottedOrderPlaced(Event):
+    @slotted
+    class Attributes:
+        order_id: str
+        customer_id: str
+        total: float
+
+    attributes: Attributes
+
+
+def _bytes_per_event(factory: Callable[[int], Any]) -> float:
+    meta = Event.Meta(id='id', type='event', occurred_on=0)
+    start()
+    events: List[Any] = [factory(i) for i in range(_EVENTS)]
+    for event in events:
+        event.meta = meta
+    current, _ = get_traced_memory()
+    stop()
+    return current / len(events)
+
+
+def _report(name: str, value: float) -> float:
+    print(f'{name:<48} {value:>10.1f} B/event')
+    return value
+
+
+def main() -> None:
+    legacy = _report(
+        'Event + Attributes (with __dict__)',
+        _bytes_per_event(lambda i: LegacyOrderPlaced(LegacyOrderPlaced.Attributes('o', 'c', float(i)))),
+    )
+    _report(
+        'Event (slotted base) + Attributes (with __dict__)',
+        _bytes_per_event(lambda i: OrderPlaced(OrderPlaced.Attributes('o', 'c', float(i)))),
+    )
+    current = _report(
+        'slotted Event + slotted Attributes',
+        _bytes_per_event(lambda i: SlottedOrderPlaced(SlottedOrderPlaced.Attributes('o', 'c', float(i)))),
+    )
+    print(f'{"memory saved":<48} {1 - current / legacy:>10.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+from calendar import timegm
+from datetime import datetime
+from uuid import uuid4
+
+from aioddd import (
+    Event,
+    EventMetaFactory,
+    MonotonicIdGenerator,
+    nanoseconds_clock,
+)
+
+from ._utils import bench
+
+
+def _legacy_meta() -> Event.Meta:
+    return Event.Meta(id=str(uuid4()), type='event', occurred_on=timegm(datetime.utcnow().utctimetuple()))
+
+
+def main() -> None:
+    legacy = bench('meta (uuid4 + utcnow + timegm)', _legacy_meta, number=100_000)
+    current = bench('meta (default factory)', EventMetaFactory(), number=100_000)
+    print(f'{"default speedup":<48} {legacy / current:>10.2f} x')
+    fast = bench(
+        'meta (monotonic id + nanoseconds)',
+        EventMetaFactory(id_generator=MonotonicIdGenerator(), clock=nanoseconds_clock),
+        number=100_000,
+    )
+    print(f'{"monotonic speedup":<48} {legacy / fast:>10.2f} x')
+
+
+if __name__ == '__main__':
+    main()
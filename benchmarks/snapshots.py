@@ -0,0 +1,80 @@
+from asyncio import run
+from dataclasses import dataclass
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, List
+
+from aioddd import (
+    ConfigEventMappers,
+    Event,
+    EventMapper,
+    EventSourcedAggregateRoot,
+    EventStore,
+    FileEventStore,
+    InMemorySnapshotStore,
+    SnapshotPolicy,
+    SnapshottingEventStore,
+)
+
+_HISTORY_LENGTHS = (100, 1_000, 10_000, 50_000)
+_SNAPSHOT_EVERY = 100
+
+
+class Deposited(Event):
+    @dataclass
+    class Attributes:
+        amount: int
+
+    attributes: Attributes
+
+
+class DepositedMapper(EventMapper):
+    event_type = Deposited
+    service_name = 'bank'
+    event_name = 'deposited'
+
+
+class Account(EventSourcedAggregateRoot):
+    def __init__(self) -> None:
+        super().__init__()
+        self.balance = 0
+
+    def apply(self, event: Event) -> None:
+        self.balance += event.attributes.amount  # type: ignore
+
+
+async def _load_time(store: EventStore, aggregate_id: str, rounds: int = 5) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = perf_counter()
+        await store.load(Account(), aggregate_id)
+        best = min(best, perf_counter() - start)
+    return best * 1e3
+
+
+async def _bench(path: str) -> None:
+    event_store = FileEventStore(path, ConfigEventMappers(mappers=[DepositedMapper()]), fsync_every=10_000)
+    snapshotting: Callable[[], EventStore] = lambda: SnapshottingEventStore(
+        event_store, InMemorySnapshotStore(), policy=SnapshotPolicy(every=_SNAPSHOT_EVERY)
+    )
+    print(f'{"events":>10} {"without snapshots":>20} {"with snapshots":>20}')
+    for length in _HISTORY_LENGTHS:
+        aggregate_id = f'account-{length}'
+        events: List[Event] = [Deposited(attributes=Deposited.Attributes(amount=1)) for _ in range(length)]
+        await event_store.append(aggregate_id, events)
+        store = snapshotting()
+        await store.load(Account(), aggregate_id)
+        await event_store.append(aggregate_id, events[: _SNAPSHOT_EVERY // 2])
+        without = await _load_time(event_store, aggregate_id)
+        with_ = await _load_time(store, aggregate_id)
+        print(f'{length:>10} {without:>17.2f} ms {with_:>17.2f} ms')
+    await event_store.close()
+
+
+def main() -> None:
+    with TemporaryDirectory() as path:
+        run(_bench(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+from asyncio import gather
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from pytest import raises
+
+from aioddd import (
+    AggregateVersionConflictError,
+    ConfigEventMappers,
+    Event,
+    EventMapper,
+    EventSourcedAggregateRoot,
+    EventStoreCorruptedError,
+    FileEventStore,
+    FileSnapshotStore,
+    InMemorySnapshotStore,
+    JsonEventCodec,
+    PickleSnapshotSerializer,
+    SnapshotPolicy,
+    SnapshottingEventStore,
+)
+
+
+class _Deposited(Event):
+    @dataclass
+    class Attributes:
+        amount: int
+
+    attributes: Attributes
+
+
+class _DepositedMapper(EventMapper):
+    event_type = _Deposited
+    service_name = 'bank'
+    event_name = 'deposited'
+
+
+class _Account(EventSourcedAggregateRoot):
+    def __init__(self) -> None:
+        super().__init__()
+        self.balance = 0
+
+    def apply(self, event: Event) -> None:
+        if isinstance(event, _Deposited):
+            self.balance += event.attributes.amount
+
+
+def _deposits(*amounts: int) -> List[Event]:
+    return [_Deposited(attributes=_Deposited.Attributes(amount=amount)) for amount in amounts]
+
+
+def _mappers() -> ConfigEventMappers:
+    return ConfigEventMappers(mappers=[_DepositedMapper()])
+
+
+async def test_file_event_store_appends_and_streams_aggregate_events(tmp_path: Path) -> None:
+    store = FileEventStore(tmp_path, _mappers(), fsync_every=2, segment_size=128)
+
+    assert await store.append('a', _deposits(1, 2)) == 2
+    assert await store.append('b', _deposits(10)) == 1
+    assert await store.append('a', _deposits(3), expected_version=2) == 3
+
+    with raises(AggregateVersionConflictError):
+        await store.append('a', _deposits(4), expected_version=2)
+
+    events = [event async for event in store.read('a')]
+    assert [event.attributes.amount for event in events] == [1, 2, 3]
+    assert [event.attributes.amount async for event in store.read('a', from_version=2)] == [3]
+    assert [event async for event in store.read('unknown')] == []
+
+    account = await store.load(_Account(), 'a')
+    assert (account.balance, account.version()) == (6, 3)
+
+    await store.append('a', _deposits(4))
+    account = await store.load(account, 'a')
+    assert (account.balance, account.version()) == (10, 4)
+
+    await store.close()
+    assert len(list(tmp_path.glob('*.log'))) > 1
+
+    reopened = FileEventStore(tmp_path, _mappers())
+    assert (reopened.version('a'), reopened.version('b')) == (4, 1)
+    assert (await reopened.load(_Account(), 'a')).balance == 10
+    await reopened.close()
+
+
+async def test_file_event_store_truncates_torn_records(tmp_path: Path) -> None:
+    store = FileEventStore(tmp_path, _mappers(), codec=JsonEventCodec())
+    await store.append('a', _deposits(1, 2))
+    await store.close()
+
+    segment = next(tmp_path.glob('*.log'))
+    size = segment.stat().st_size
+    with segment.open('ab') as file:
+        file.write(b'\x05\x00\x00')
+
+    store = FileEventStore(tmp_path, _mappers(), codec=JsonEventCodec())
+
+    assert segment.stat().st_size == size
+    assert store.version('a') == 2
+    assert await store.append('a', _deposits(3)) == 3
+    assert (await store.load(_Account(), 'a')).balance == 6
+    await store.close()
+
+
+async def test_file_event_store_raises_on_corrupted_records_before_the_tail(tmp_path: Path) -> None:
+    store = FileEventStore(tmp_path, _mappers(), segment_size=64)
+    for amount in range(6):
+        await store.append('a', _deposits(amount))
+    await store.close()
+
+    segments = sorted(tmp_path.glob('*.log'))
+    sizes = [segment.stat().st_size for segment in segments]
+    assert len(segments) > 2
+    data = bytearray(segments[0].read_bytes())
+    data[-1] ^= 0xFF
+    segments[0].write_bytes(data)
+
+    with raises(EventStoreCorruptedError):
+        FileEventStore(tmp_path, _mappers())
+    assert [segment.stat().st_size for segment in segments] == sizes
+
+    data[-1] ^= 0xFF
+    segments[0].write_bytes(data)
+    segments[1].unlink()
+    with raises(EventStoreCorruptedError):
+        FileEventStore(tmp_path, _mappers())
+
+
+async def test_file_event_store_rolls_back_partial_appends(tmp_path: Path) -> None:
+    store = FileEventStore(tmp_path, _mappers())
+    await store.append('a', _deposits(1))
+    file = store._writable()
+
+    class _FullDisk:
+        def write(self, data: memoryview) -> int:
+            file.write(data[: len(data) // 2])
+            raise OSError('No space left on device')
+
+        def __getattr__(self, name: str) -> object:
+            return getattr(file, name)
+
+    store._file = _FullDisk()  # type: ignore
+    with raises(OSError):
+        await store.append('a', _deposits(2, 3))
+    store._file = file
+
+    assert await store.append('a', _deposits(4)) == 2
+    assert [event.attributes.amount async for event in store.read('a')] == [1, 4]
+    await store.close()
+    assert FileEventStore(tmp_path, _mappers()).version('a') == 2
+
+
+async def test_snapshotting_event_store_replays_only_newer_events(tmp_path: Path) -> None:
+    for snapshot_store in (InMemorySnapshotStore(), FileSnapshotStore(tmp_path / 'snapshots')):
+        event_store = FileEventStore(tmp_path / str(id(snapshot_store)), _mappers())
+        store = SnapshottingEventStore(
+            event_store, snapshot_store, serializer=PickleSnapshotSerializer(), policy=SnapshotPolicy(every=3)
+        )
+        await store.append('a/1', _deposits(1, 2))
+
+        account = await store.load(_Account(), 'a/1')
+
+        assert (account.balance, account.version()) == (3, 2)
+        assert await snapshot_store.latest('a/1') is None
+
+        await store.append('a/1', _deposits(3, 4))
+        account = await store.load(_Account(), 'a/1')
+
+        assert (account.balance, account.version()) == (10, 4)
+        assert (await snapshot_store.latest('a/1') or (0,))[0] == 4
+
+        await store.append('a/1', _deposits(5))
+        replayed = [event.attributes.amount async for event in store.read('a/1', from_version=4)]
+        account = await store.load(_Account(), 'a/1')
+
+        assert replayed == [5]
+        assert (account.balance, account.version(), store.version('a/1')) == (15, 5, 5)
+        assert (await snapshot_store.latest('a/1') or (0,))[0] == 4
+        await event_store.close()
+
+    raises(ValueError, lambda: SnapshotPolicy(every=0))
+    raises(ValueError, lambda: SnapshottingEventStore(event_store, FileSnapshotStore(tmp_path / 'snapshots')))
+
+
+async def test_snapshotting_event_store_measures_the_policy_from_the_stored_snapshot(tmp_path: Path) -> None:
+    snapshot_store = FileSnapshotStore(tmp_path / 'snapshots')
+    event_store = FileEventStore(tmp_path / 'events', _mappers())
+    store = SnapshottingEventStore(
+        event_store, snapshot_store, serializer=PickleSnapshotSerializer(), policy=SnapshotPolicy(every=3)
+    )
+    await store.append('a', _deposits(1, 2))
+    account = await store.load(_Account(), 'a')
+    assert await snapshot_store.latest_version('a') == 0
+
+    await store.append('a', _deposits(3))
+    account = await store.load(account, 'a')
+
+    assert account.version() == 3
+    assert await snapshot_store.latest_version('a') == 3
+    await event_store.close()
+
+
+async def test_snapshot_stores_keep_the_highest_version_on_concurrent_saves(tmp_path: Path) -> None:
+    for snapshot_store in (InMemorySnapshotStore(), FileSnapshotStore(tmp_path / 'snapshots')):
+        for _ in range(20):
+            await gather(*(snapshot_store.save('a', version, str(version).encode()) for version in (2, 1, 3)))
+            await snapshot_store.save('a', 1, b'1')
+
+            assert await snapshot_store.latest('a') == (3, b'3')
+
+    assert [path.suffix for path in (tmp_path / 'snapshots').iterdir()] == ['.snapshot']
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Type
+
+from pytest import raises
+
+from aioddd import (
+    ConfigEventMappers,
+    Event,
+    EventHandler,
+    EventMapper,
+    EventNotHandledError,
+    ProcessPoolEventBus,
+)
+
+
+class _EventTest(Event):
+    @dataclass
+    class Attributes:
+        value: int
+
+    attributes: Attributes
+
+
+class _EventTestMapper(EventMapper):
+    event_type = _EventTest
+    service_name = 'svc'
+    event_name = 'test'
+
+
+class _FileEventHandler(EventHandler):
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def subscribed_to(self) -> List[Type[Event]]:
+        return [_EventTest]
+
+    async def handle(self, events: List[Event]) -> None:
+        with self._path.open('a') as file:
+            file.write(','.join(str(event.attributes.value) for event in events) + '\n')  # type: ignore
+
+    def max_batch_size(self) -> int:
+        return 2
+
+
+class _FailingEventHandler(EventHandler):
+    def subscribed_to(self) -> List[Type[Event]]:
+        return [_EventTest]
+
+    async def handle(self, events: List[Event]) -> None:
+        raise ValueError(len(events))
+
+
+async def test_process_pool_event_bus_handles_events_in_worker_processes(tmp_path: Path) -> None:
+    path = tmp_path / 'events.txt'
+    bus = ProcessPoolEventBus(
+        handlers=[_FileEventHandler(path)], mappers=ConfigEventMappers(mappers=[_EventTestMapper()]), max_workers=2
+    )
+
+    try:
+        await bus.notify(events=[_EventTest(attributes=_EventTest.Attributes(value=i)) for i in range(5)])
+    finally:
+        await bus.close()
+
+    assert sorted(path.read_text().splitlines()) == ['0,1', '2,3', '4']
+
+
+async def test_process_pool_event_bus_aggregates_handler_errors(tmp_path: Path) -> None:
+    bus = ProcessPoolEventBus(
+        handlers=[_FailingEventHandler(), _FileEventHandler(tmp_path / 'events.txt')],
+        mappers=ConfigEventMappers(mappers=[_EventTestMapper()]),
+        max_workers=1,
+    )
+
+    try:
+        with raises(EventNotHandledError) as err:
+            await bus.notify(events=[_EventTest(attributes=_EventTest.Attributes(value=i)) for i in range(3)])
+    finally:
+        await bus.close()
+
+    assert [str(error) for error in err.value.errors()] == ['3']
+    assert (tmp_path / 'events.txt').read_text().splitlines() == ['0,1', '2']
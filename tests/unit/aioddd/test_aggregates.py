@@ -1,4 +1,7 @@
-from aioddd import AggregateRoot, Event
+from pytest import raises
+
+from aioddd import AggregateRoot, Event, UnitOfWork
+from aioddd.testing import AsyncMock, Mock
 
 
 def test_aggregates() -> None:
@@ -18,3 +21,63 @@ def test_aggregates() -> None:
 
     assert len(events) == 1
     assert not len(agg.pull_aggregate_events())
+
+
+class _UnitOfWorkAggregateRoot(AggregateRoot):
+    pass
+
+
+class _UnitOfWorkEvent(Event):
+    pass
+
+
+async def test_unit_of_work_publishes_tracked_aggregate_events_at_once() -> None:
+    publisher_mock = Mock()
+    publisher_mock.publish = AsyncMock(return_value=None)
+    agg1, agg2 = _UnitOfWorkAggregateRoot(), _UnitOfWorkAggregateRoot()
+    events = [_UnitOfWorkEvent() for _ in range(3)]
+
+    async with UnitOfWork(publisher_mock) as uow:
+        uow.track(agg1).record_aggregate_event(events[0])
+        uow.track(agg2).record_aggregate_event(events[2])
+        uow.track(agg1).record_aggregate_event(events[1])
+
+    publisher_mock.publish.assert_awaited_once_with([events[0], events[1], events[2]])
+    assert not agg1.pull_aggregate_events() and not agg2.pull_aggregate_events()
+
+    await uow.commit()
+    publisher_mock.publish.assert_awaited_once()
+
+
+async def test_unit_of_work_discards_events_on_rollback() -> None:
+    publisher_mock = Mock()
+    publisher_mock.publish = AsyncMock(return_value=None)
+    agg = _UnitOfWorkAggregateRoot()
+
+    with raises(ValueError):
+        async with UnitOfWork(publisher_mock) as uow:
+            uow.track(agg).record_aggregate_event(_UnitOfWorkEvent())
+            raise ValueError('test')
+
+    publisher_mock.publish.assert_not_awaited()
+    assert not agg.pull_aggregate_events()
+
+
+async def test_unit_of_work_keeps_events_when_publish_fails() -> None:
+    publisher_mock = Mock()
+    publisher_mock.publish = AsyncMock(side_effect=[ConnectionError('broker down'), None])
+    agg1, agg2 = _UnitOfWorkAggregateRoot(), _UnitOfWorkAggregateRoot()
+    events = [_UnitOfWorkEvent() for _ in range(2)]
+
+    with raises(ConnectionError):
+        async with UnitOfWork(publisher_mock) as uow:
+            uow.track(agg1).record_aggregate_event(events[0])
+            uow.track(agg2).record_aggregate_event(events[1])
+
+    assert agg1._events == [events[0]] and agg2._events == [events[1]]
+
+    await uow.commit()
+
+    publisher_mock.publish.assert_awaited_with([events[0], events[1]])
+    assert publisher_mock.publish.await_count == 2
+    assert not agg1.pull_aggregate_events() and not agg2.pull_aggregate_events()
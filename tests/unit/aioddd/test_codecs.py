@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from json import dumps, loads
+from typing import Any, Dict, List, Tuple
+
+from pytest import raises
+
+from aioddd import (
+    BinaryEventCodec,
+    ConfigEventMappers,
+    Event,
+    EventMapper,
+    JsonEventCodec,
+)
+from aioddd.testing import patch
+
+
+@dataclass
+class _Item:
+    sku: str
+    quantity: int
+
+
+class _EventTest(Event):
+    @dataclass
+    class Attributes:
+        name: str
+        count: int
+        negative: int
+        big: int
+        ratio: float
+        active: bool
+        nothing: None
+        raw: bytes
+        items: List[_Item]
+        point: Tuple[int, str]
+        extra: Dict[str, Any]
+
+    attributes: Attributes
+
+
+class _OtherEventTest(Event):
+    pass
+
+
+def _create_mappers() -> Tuple[ConfigEventMappers, EventMapper, EventMapper]:
+    class _EventTestMapper(EventMapper):
+        event_type = _EventTest
+        service_name = 'svc'
+        event_name = 'test'
+
+    class _OtherEventTestMapper(EventMapper):
+        event_type = _OtherEventTest
+        service_name = 'svc'
+        event_name = 'other'
+
+    mapper, other_mapper = _EventTestMapper(), _OtherEventTestMapper()
+    return ConfigEventMappers(mappers=[mapper, other_mapper]), mapper, other_mapper
+
+
+def _create_event() -> _EventTest:
+    return _EventTest(
+        attributes=_EventTest.Attributes(
+            name='ñandú',
+            count=42,
+            negative=-7,
+            big=2**70,
+            ratio=0.25,
+            active=True,
+            nothing=None,
+            raw=b'\x00\x01',
+            items=[_Item(sku='a', quantity=1)],
+            point=(1, 'x'),
+            extra={'nested': [False, {'k': -1.5}]},
+        )
+    )
+
+
+def test_binary_event_codec_round_trips_the_dict_encoding() -> None:
+    mappers, mapper, _ = _create_mappers()
+    event = _create_event()
+    codec = BinaryEventCodec()
+
+    data = codec.encode(mapper, event)
+
+    assert codec.message_name(data) == 'svc.test'
+    assert b'count' not in data
+    assert len(data) < len(dumps(mapper.encode(event), default=list, separators=(',', ':')))
+    decoded = codec.decode(mapper, data)
+    assert mapper.encode(decoded) == mapper.encode(event)
+    assert codec.decode_with(mappers, data).meta == event.meta
+
+
+def test_binary_event_codec_encodes_into_caller_buffers() -> None:
+    _, mapper, other_mapper = _create_mappers()
+    event, other_event = _create_event(), _OtherEventTest()
+    codec = BinaryEventCodec()
+    size = len(codec.encode(mapper, event))
+
+    buffer = bytearray()
+    end = codec.encode_into(mapper, event, buffer)
+    end = codec.encode_into(other_mapper, other_event, buffer, end)
+
+    assert end == len(buffer)
+    assert codec.decode(other_mapper, memoryview(buffer)[size:]) == other_event
+
+    view = memoryview(bytearray(size))
+    assert codec.encode_into(mapper, event, view) == size
+    assert mapper.encode(codec.decode(mapper, view)) == mapper.encode(event)
+    raises(ValueError, lambda: codec.encode_into(mapper, event, view, 1))
+
+    padded = bytearray(b'\xff' * (size + 4))
+    assert codec.encode_into(mapper, event, padded, 2) == size + 2
+    assert padded[:2] == padded[-2:] == b'\xff\xff'
+    assert mapper.encode(codec.decode(mapper, padded[2:-2])) == mapper.encode(event)
+    raises(ValueError, lambda: codec.encode_into(mapper, event, padded, len(padded) + 1))
+
+
+def test_binary_event_codec_encodes_and_decodes_many() -> None:
+    mappers, _, _ = _create_mappers()
+    events: List[Event] = [_create_event(), _OtherEventTest(), _create_event()]
+    codec = BinaryEventCodec()
+
+    data = codec.encode_many(mappers, events)
+
+    assert list(codec.decode_many(mappers, data)) == [
+        mappers.find_by_type(event).decode(mappers.find_by_type(event).encode(event)) for event in events
+    ]
+
+
+def test_binary_event_codec_falls_back_to_keys_for_custom_attributes() -> None:
+    class _CustomMapper(EventMapper):
+        event_type = _OtherEventTest
+        service_name = 'svc'
+        event_name = 'custom'
+
+        @staticmethod
+        def map_attributes(attributes: Event.Attributes) -> Dict[str, Any]:
+            return {}
+
+    mapper = _CustomMapper()
+    event = _OtherEventTest()
+    codec = BinaryEventCodec()
+
+    assert codec.decode(mapper, codec.encode(mapper, event)) == event
+
+
+def test_binary_event_codec_rejects_unsupported_values() -> None:
+    _, mapper, _ = _create_mappers()
+    event = _create_event()
+    event.attributes.extra = {'value': {1, 2}}
+
+    raises(TypeError, lambda: BinaryEventCodec().encode(mapper, event))
+    raises(ValueError, lambda: BinaryEventCodec().message_name(b'\x09'))
+
+
+def test_json_event_codec() -> None:
+    mappers, mapper, _ = _create_mappers()
+    event = _OtherEventTest()
+    codec = JsonEventCodec()
+
+    data = codec.encode(mappers.find_by_type(event), event)
+
+    assert codec.message_name(data) == 'svc.other'
+    with patch('aioddd.codecs.loads', wraps=loads) as loads_mock:
+        assert codec.decode_with(mappers, data) == event
+    loads_mock.assert_called_once()
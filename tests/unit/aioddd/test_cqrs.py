@@ -1,13 +1,31 @@
+from asyncio import CancelledError
+from asyncio import Event as Event_
+from asyncio import create_task, gather, sleep, wait_for
+from dataclasses import dataclass
+from typing import List, Set, Type, Union, cast
+
 from pytest import raises
 
 from aioddd import (
+    BatchQueryHandler,
+    CachingQueryBus,
     Command,
+    CommandAlreadyRegisteredError,
+    CommandNotDispatchedError,
     CommandNotRegisteredError,
+    Next,
+    OptionalResponse,
+    PartitionedCommandBus,
     Query,
+    QueryAlreadyRegisteredError,
+    QueryHandler,
     QueryNotRegisteredError,
     SimpleCommandBus,
+    SimpleEventBus,
     SimpleQueryBus,
+    query_key,
 )
+from aioddd.events import Event
 from aioddd.testing import AsyncMock, Mock
 
 
@@ -56,6 +74,36 @@ async def test_simple_command_bus_fails_because_command_was_not_registered() ->
         await bus.dispatch(command=command)
 
 
+async def test_simple_command_bus_resolves_handlers_by_command_type_hierarchy() -> None:
+    class _CommandTest(Command):
+        pass
+
+    class _ChildCommandTest(_CommandTest):
+        pass
+
+    class _GrandChildCommandTest(_ChildCommandTest):
+        pass
+
+    command_handler_mock1 = Mock()
+    command_handler_mock1.subscribed_to = lambda: _CommandTest
+    command_handler_mock1.handle = AsyncMock(return_value=None)
+    command_handler_mock2 = Mock()
+    command_handler_mock2.subscribed_to = lambda: _ChildCommandTest
+    command_handler_mock2.handle = AsyncMock(return_value=None)
+
+    bus = SimpleCommandBus(handlers=[command_handler_mock1])
+
+    await bus.dispatch(command=_GrandChildCommandTest())
+    command_handler_mock1.handle.assert_called_once()
+
+    bus.add_handler(handler=command_handler_mock2)
+    await bus.dispatch(command=_GrandChildCommandTest())
+    command_handler_mock2.handle.assert_called_once()
+
+    with raises(CommandAlreadyRegisteredError):
+        bus.add_handler(handler=command_handler_mock1)
+
+
 async def test_simple_query_bus() -> None:
     query_handler_mock1 = Mock()
     query_handler_mock2 = Mock()
@@ -100,3 +148,430 @@ async def test_simple_query_bus_fails_because_query_was_not_registered() -> None
 
     with raises(QueryNotRegisteredError):
         await bus.ask(query=query)
+
+
+async def test_simple_query_bus_resolves_handlers_by_query_type_hierarchy() -> None:
+    class _QueryTest(Query):
+        pass
+
+    class _ChildQueryTest(_QueryTest):
+        pass
+
+    query_handler_mock = Mock()
+    query_handler_mock.subscribed_to = lambda: _QueryTest
+    query_handler_mock.handle = AsyncMock(return_value='test')
+
+    bus = SimpleQueryBus(handlers=[query_handler_mock])
+
+    assert await bus.ask(query=_ChildQueryTest()) == 'test'
+
+    with raises(QueryAlreadyRegisteredError):
+        SimpleQueryBus(handlers=[query_handler_mock, query_handler_mock])
+
+
+@dataclass
+class _FindUserQuery(Query):
+    id: str
+    fields: List[str]
+
+
+class _FindOrderQuery(Query):
+    def __init__(self, ref: str) -> None:
+        self.ref = ref
+
+
+class _UserUpdated(Event):
+    pass
+
+
+async def test_caching_query_bus_caches_responses_by_query_fields() -> None:
+    now = [0.0]
+    query_bus_mock = Mock()
+    query_bus_mock.ask = AsyncMock(side_effect=lambda query: {'key': query_key(query)})
+    bus = CachingQueryBus(query_bus=query_bus_mock, ttl={_FindUserQuery: 10}, clock=lambda: now[0])
+
+    res1 = await bus.ask(query=_FindUserQuery(id='1', fields=['name']))
+    res2 = await bus.ask(query=_FindUserQuery(id='1', fields=['name']))
+    await bus.ask(query=_FindUserQuery(id='2', fields=['name']))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+
+    assert res1 is res2
+    assert query_bus_mock.ask.call_count == 4
+    assert bus.stats() == {'size': 2, 'hits': 1, 'misses': 2, 'evictions': 0, 'invalidations': 0}
+
+    now[0] = 10
+    await bus.ask(query=_FindUserQuery(id='1', fields=['name']))
+    assert query_bus_mock.ask.call_count == 5
+    assert query_key(_FindOrderQuery(ref='1')) == (('ref', '1'),)
+
+
+async def test_caching_query_bus_evicts_least_recently_used_entries() -> None:
+    query_bus_mock = Mock()
+    query_bus_mock.ask = AsyncMock(return_value='test')
+    bus = CachingQueryBus(query_bus=query_bus_mock, default_ttl=60, max_size=2)
+
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+    await bus.ask(query=_FindOrderQuery(ref='2'))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+    await bus.ask(query=_FindOrderQuery(ref='3'))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+
+    assert query_bus_mock.ask.call_count == 3
+    assert bus.stats()['evictions'] == 1
+
+    await bus.ask(query=_FindOrderQuery(ref='2'))
+    assert query_bus_mock.ask.call_count == 4
+    raises(ValueError, lambda: CachingQueryBus(query_bus=query_bus_mock, max_size=0))
+
+
+async def test_caching_query_bus_invalidates_entries_on_events() -> None:
+    query_bus_mock = Mock()
+    query_bus_mock.ask = AsyncMock(return_value='test')
+    bus = CachingQueryBus(query_bus=query_bus_mock, default_ttl=60, invalidate_on={_UserUpdated: [_FindUserQuery]})
+    event_bus = SimpleEventBus(handlers=[bus.invalidation_handler()])
+
+    await bus.ask(query=_FindUserQuery(id='1', fields=[]))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+    await event_bus.notify(events=[_UserUpdated()])
+    await bus.ask(query=_FindUserQuery(id='1', fields=[]))
+    await bus.ask(query=_FindOrderQuery(ref='1'))
+
+    assert query_bus_mock.ask.call_count == 3
+    assert bus.stats()['invalidations'] == 1
+
+    bus.invalidate()
+    assert bus.stats()['size'] == 0
+
+
+async def test_simple_query_bus_single_flight_shares_in_flight_asks() -> None:
+    release = Event_()
+    calls = []
+
+    async def handle(query: Query) -> str:
+        calls.append(query)
+        await release.wait()
+        return 'test'
+
+    handler_mock = Mock(spec=QueryHandler)
+    handler_mock.subscribed_to.return_value = _FindOrderQuery
+    handler_mock.handle = handle
+    bus = SimpleQueryBus([handler_mock], single_flight=True)
+
+    first = create_task(bus.ask(_FindOrderQuery(ref='1')))
+    cancelled = create_task(bus.ask(_FindOrderQuery(ref='1')))
+    other = create_task(bus.ask(_FindOrderQuery(ref='2')))
+    await sleep(0)
+    cancelled.cancel()
+    await sleep(0)
+    release.set()
+
+    assert await first == 'test'
+    assert await other == 'test'
+    assert cancelled.cancelled()
+    assert len(calls) == 2
+
+    await bus.ask(_FindOrderQuery(ref='1'))
+    assert len(calls) == 3
+
+
+async def test_simple_query_bus_single_flight_cancels_the_call_without_waiters() -> None:
+    cancelled = []
+
+    async def handle(_: Query) -> None:
+        try:
+            await sleep(10)
+        except CancelledError:
+            cancelled.append(True)
+            raise
+
+    handler_mock = Mock(spec=QueryHandler)
+    handler_mock.subscribed_to.return_value = _FindOrderQuery
+    handler_mock.handle = handle
+    bus = SimpleQueryBus([handler_mock], single_flight=True)
+
+    task = create_task(bus.ask(_FindOrderQuery(ref='1')))
+    await sleep(0)
+    task.cancel()
+    with raises(CancelledError):
+        await task
+    await sleep(0)
+
+    assert cancelled == [True]
+
+
+class _FindOrdersHandler(BatchQueryHandler):
+    def __init__(self, max_batch_size: int = 100, batch_window: float = 0.0) -> None:
+        self._max_batch_size = max_batch_size
+        self._batch_window = batch_window
+        self.batches: List[List[str]] = []
+
+    def subscribed_to(self) -> Type[Query]:
+        return _FindOrderQuery
+
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    def batch_window(self) -> float:
+        return self._batch_window
+
+    async def handle_many(self, queries: List[Query]) -> List[Union[OptionalResponse, Exception]]:
+        refs = [cast(_FindOrderQuery, query).ref for query in queries]
+        self.batches.append(refs)
+        if 'fail' in refs:
+            raise ValueError('test')
+        return [ValueError(ref) if ref == 'missing' else {'ref': ref} for ref in refs]
+
+
+async def test_batch_query_handler_resolves_queries_of_the_same_tick_at_once() -> None:
+    handler = _FindOrdersHandler(max_batch_size=3)
+    bus = SimpleQueryBus([handler])
+
+    responses = await gather(*(bus.ask(_FindOrderQuery(ref=str(ref))) for ref in range(5)))
+
+    assert responses == [{'ref': str(ref)} for ref in range(5)]
+    assert handler.batches == [['0', '1', '2'], ['3', '4']]
+    await sleep(0)
+    assert not handler._background
+
+
+async def test_batch_query_handler_raises_errors_to_their_callers() -> None:
+    handler = _FindOrdersHandler(batch_window=0.01)
+    bus = SimpleQueryBus([handler])
+
+    found, missing = await gather(
+        bus.ask(_FindOrderQuery(ref='1')), bus.ask(_FindOrderQuery(ref='missing')), return_exceptions=True
+    )
+    assert found == {'ref': '1'}
+    assert isinstance(missing, ValueError)
+
+    results = await gather(
+        bus.ask(_FindOrderQuery(ref='1')), bus.ask(_FindOrderQuery(ref='fail')), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert handler.batches == [['1', 'missing'], ['1', 'fail']]
+
+
+async def test_simple_command_bus_middlewares_wrap_dispatch() -> None:
+    calls: List[str] = []
+
+    async def transactional(command: Command, next_: Next) -> None:
+        calls.append('begin')
+        await next_(command)
+        calls.append('commit')
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: Command
+    command_handler_mock.handle = AsyncMock(side_effect=lambda command: calls.append('handler'))
+    bus = SimpleCommandBus([command_handler_mock])
+    assert 'dispatch' not in vars(bus)
+
+    bus.add_middleware(transactional)
+    await bus.dispatch(command=Command())
+
+    assert calls == ['begin', 'handler', 'commit']
+
+
+async def test_simple_query_bus_middlewares_wrap_ask() -> None:
+    async def enveloped(query: Query, next_: Next) -> OptionalResponse:
+        return {'data': await next_(query)}
+
+    async def failing(query: Query, next_: Next) -> OptionalResponse:
+        raise ValueError('test')
+
+    query_handler_mock = Mock()
+    query_handler_mock.subscribed_to = lambda: Query
+    query_handler_mock.handle = AsyncMock(return_value='test')
+
+    bus = SimpleQueryBus([query_handler_mock], middlewares=[enveloped])
+    assert await bus.ask(query=Query()) == {'data': 'test'}
+
+    bus.add_middleware(failing)
+    with raises(ValueError):
+        await bus.ask(query=Query())
+    query_handler_mock.handle.assert_awaited_once()
+
+
+class _RefCommand(Command):
+    def __init__(self, ref: str) -> None:
+        self.ref = ref
+
+
+async def test_command_bus_dispatch_many_reports_errors_per_command() -> None:
+    running: List[str] = []
+    max_running = 0
+
+    async def handle(command: _RefCommand) -> None:
+        nonlocal max_running
+        running.append(command.ref)
+        max_running = max(max_running, len(running))
+        await sleep(0)
+        running.remove(command.ref)
+        if command.ref == 'fail':
+            raise ValueError('test')
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: Command
+    command_handler_mock.handle = handle
+    bus = SimpleCommandBus([command_handler_mock])
+
+    class _UnknownCommand:
+        pass
+
+    errors = await bus.dispatch_many(
+        [_RefCommand('1'), _RefCommand('fail'), cast(Command, _UnknownCommand()), _RefCommand('2')],
+        concurrency=2,
+    )
+
+    assert errors[0] is None and errors[3] is None
+    assert isinstance(errors[1], ValueError)
+    assert isinstance(errors[2], CommandNotRegisteredError)
+    assert max_running == 2
+    with raises(ValueError):
+        await bus.dispatch_many([Command()], concurrency=0)
+
+
+async def test_command_bus_dispatch_many_reports_cancelled_error_per_command() -> None:
+    async def handle(command: _RefCommand) -> None:
+        if command.ref == 'cancel':
+            raise CancelledError()
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: _RefCommand
+    command_handler_mock.handle = handle
+    bus = SimpleCommandBus([command_handler_mock])
+    commands = [_RefCommand('1'), _RefCommand('cancel'), _RefCommand('2'), _RefCommand('3')]
+
+    for concurrency in (1, 2):
+        errors = await bus.dispatch_many(iter(commands), concurrency=concurrency)
+        assert len(errors) == 4
+        assert isinstance(errors[1], CancelledError)
+        assert [errors[0], errors[2], errors[3]] == [None, None, None]
+
+
+async def test_command_bus_dispatch_many_reraises_system_exit() -> None:
+    async def handle(command: _RefCommand) -> None:
+        if command.ref == 'exit':
+            raise SystemExit(2)
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: _RefCommand
+    command_handler_mock.handle = handle
+    bus = SimpleCommandBus([command_handler_mock])
+
+    for concurrency in (1, 2):
+        with raises(SystemExit):
+            await bus.dispatch_many([_RefCommand('1'), _RefCommand('exit'), _RefCommand('2')], concurrency=concurrency)
+
+
+async def test_query_bus_ask_many_returns_responses_in_order_or_as_completed() -> None:
+    async def handle(query: _FindOrderQuery) -> str:
+        await sleep(0.01 * int(query.ref))
+        return query.ref
+
+    query_handler_mock = Mock()
+    query_handler_mock.subscribed_to = lambda: _FindOrderQuery
+    query_handler_mock.handle = handle
+    bus = SimpleQueryBus([query_handler_mock])
+    queries = [_FindOrderQuery(ref) for ref in ('3', '1', '2')]
+
+    assert await bus.ask_many(queries) == ['3', '1', '2']
+    assert [result async for result in bus.ask_many_as_completed(queries)] == [(1, '1'), (2, '2'), (0, '3')]
+    assert [result async for result in bus.ask_many_as_completed(queries, concurrency=1)] == [
+        (0, '3'),
+        (1, '1'),
+        (2, '2'),
+    ]
+
+
+class _AggregateCommand(Command):
+    def __init__(self, aggregate_id: str, ref: str) -> None:
+        self.aggregate_id = aggregate_id
+        self.ref = ref
+
+
+async def test_partitioned_command_bus_keeps_order_per_key() -> None:
+    handled: List[str] = []
+    running: Set[str] = set()
+
+    async def handle(command: _AggregateCommand) -> None:
+        assert command.aggregate_id not in running
+        running.add(command.aggregate_id)
+        await sleep(0.001 * int(command.ref))
+        running.discard(command.aggregate_id)
+        handled.append(f'{command.aggregate_id}:{command.ref}')
+        if command.ref == '0':
+            raise ValueError('test')
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: _AggregateCommand
+    command_handler_mock.handle = handle
+    bus = PartitionedCommandBus(
+        SimpleCommandBus([command_handler_mock]), key=lambda command: command.aggregate_id, lanes=2  # type: ignore
+    )
+    commands = [_AggregateCommand(aggregate_id, ref) for ref in ('3', '0', '1') for aggregate_id in ('a', 'b', 'c')]
+
+    errors = await bus.dispatch_many(commands, concurrency=len(commands))
+    await bus.close()
+
+    for aggregate_id in ('a', 'b', 'c'):
+        assert [item for item in handled if item.startswith(aggregate_id)] == [
+            f'{aggregate_id}:3',
+            f'{aggregate_id}:0',
+            f'{aggregate_id}:1',
+        ]
+    assert [isinstance(error, ValueError) for error in errors] == [False] * 3 + [True] * 3 + [False] * 3
+    stats = bus.stats()
+    assert len(stats) == 2
+    assert sum(lane['dispatched'] for lane in stats) == 6
+    assert sum(lane['failed'] for lane in stats) == 3
+    assert all(lane['depth'] == 0 for lane in stats)
+    assert max(lane['max_depth'] for lane in stats) > 1
+    with raises(CommandNotDispatchedError):
+        await bus.dispatch(commands[0])
+    raises(ValueError, lambda: PartitionedCommandBus(bus, key=id, lanes=0))
+
+
+async def test_partitioned_command_bus_survives_commands_raising_cancelled_error() -> None:
+    async def handle(command: _AggregateCommand) -> None:
+        if command.ref == 'cancel':
+            raise CancelledError()
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: _AggregateCommand
+    command_handler_mock.handle = handle
+    bus = PartitionedCommandBus(SimpleCommandBus([command_handler_mock]), key=lambda _: 'a', lanes=1)
+
+    cancelled = create_task(bus.dispatch(_AggregateCommand('a', 'cancel')))
+    await wait_for(bus.dispatch(_AggregateCommand('a', '1')), timeout=1)
+    await wait_for(bus.close(), timeout=1)
+
+    with raises(CancelledError):
+        await cancelled
+    assert (bus.stats()[0]['failed'], bus.stats()[0]['dispatched']) == (1, 1)
+
+
+async def test_caching_query_bus_does_not_cache_responses_read_before_an_invalidation() -> None:
+    values = iter([1, 2])
+    started, release = Event_(), Event_()
+
+    async def ask(query: Query) -> int:
+        value = next(values)
+        if value == 1:
+            started.set()
+            await release.wait()
+        return value
+
+    query_bus_mock = Mock()
+    query_bus_mock.ask = ask
+    bus = CachingQueryBus(query_bus=query_bus_mock, default_ttl=60, invalidate_on={_UserUpdated: [Query]})
+    event_bus = SimpleEventBus(handlers=[bus.invalidation_handler()])
+
+    in_flight = create_task(bus.ask(query=_FindOrderQuery(ref='1')))
+    await started.wait()
+    await event_bus.notify(events=[_UserUpdated()])
+    release.set()
+
+    assert await in_flight == 1
+    assert await bus.ask(query=_FindOrderQuery(ref='1')) == 2
+    assert await bus.ask(query=_FindOrderQuery(ref='1')) == 2
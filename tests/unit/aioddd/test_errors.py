@@ -3,14 +3,20 @@ from pytest import raises
 from aioddd import (
     BadRequestError,
     BaseError,
+    CommandAlreadyRegisteredError,
+    CommandNotDispatchedError,
     CommandNotRegisteredError,
     ConflictError,
     DateTimeInvalidError,
+    EventMapperAlreadyRegisteredError,
     EventMapperNotFoundError,
+    EventNotHandledError,
     EventNotPublishedError,
+    EventStoreCorruptedError,
     ForbiddenError,
     IdInvalidError,
     NotFoundError,
+    QueryAlreadyRegisteredError,
     QueryNotRegisteredError,
     TimestampInvalidError,
     UnauthorizedError,
@@ -119,6 +125,21 @@ def test_event_not_published_error() -> None:
     assert err.title() == 'Event not published'
 
 
+def test_event_mapper_already_registered_error() -> None:
+    err = EventMapperAlreadyRegisteredError()
+    assert err.code() == 'event_mapper_already_registered'
+    assert err.title() == 'Event Mapper already registered'
+
+
+def test_event_not_handled_error() -> None:
+    errors = [ValueError('test')]
+    err = EventNotHandledError().with_errors(errors)
+    assert err.code() == 'event_not_handled'
+    assert err.title() == 'Event not handled'
+    assert err.errors() == errors
+    assert EventNotHandledError().errors() == []
+
+
 def test_command_not_registered_error() -> None:
     err = CommandNotRegisteredError()
     assert err.code() == 'command_not_registered_error'
@@ -129,3 +150,27 @@ def test_query_not_registered_error() -> None:
     err = QueryNotRegisteredError()
     assert err.code() == 'query_not_registered_error'
     assert err.title() == 'Query not registered'
+
+
+def test_event_store_corrupted_error() -> None:
+    err = EventStoreCorruptedError()
+    assert err.code() == 'event_store_corrupted'
+    assert err.title() == 'Event store corrupted'
+
+
+def test_command_not_dispatched_error() -> None:
+    err = CommandNotDispatchedError()
+    assert err.code() == 'command_not_dispatched_error'
+    assert err.title() == 'Command not dispatched'
+
+
+def test_command_already_registered_error() -> None:
+    err = CommandAlreadyRegisteredError()
+    assert err.code() == 'command_already_registered_error'
+    assert err.title() == 'Command already registered'
+
+
+def test_query_already_registered_error() -> None:
+    err = QueryAlreadyRegisteredError()
+    assert err.code() == 'query_already_registered_error'
+    assert err.title() == 'Query already registered'
@@ -1,22 +1,46 @@
+from asyncio import CancelledError
+from asyncio import Event as Event_
+from asyncio import StreamReader
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import sleep, wait_for
+from copy import deepcopy
 from dataclasses import asdict, dataclass
+from io import BytesIO
+from json import loads
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Type
+from weakref import ref
 
 from pytest import raises
 
 from aioddd import (
+    BufferedEventPublisher,
     ConfigEventMappers,
     Event,
     EventBus,
+    EventHandler,
     EventMapper,
+    EventMapperAlreadyRegisteredError,
     EventMapperNotFoundError,
+    EventMetaFactory,
+    EventNotHandledError,
+    EventNotPublishedError,
     EventPublisher,
     EventPublishers,
     Id,
     InternalEventPublisher,
+    MonotonicIdGenerator,
+    Next,
+    QueueEventBus,
     SimpleEventBus,
     find_event_mapper_by_name,
     find_event_mapper_by_type,
+    milliseconds_clock,
+    nanoseconds_clock,
+    seconds_clock,
+    set_event_meta_factory,
+    slotted,
 )
-from aioddd.testing import AsyncMock, Mock, mock
+from aioddd.testing import AsyncMock, Mock, mock, patch
 
 
 def test_event_and_event_mapper() -> None:
@@ -54,6 +78,210 @@ def test_event_and_event_mapper() -> None:
     assert event_decoded.attributes == event.attributes
 
 
+def test_event_mapper_encodes_and_decodes_like_dataclasses_asdict() -> None:
+    @dataclass
+    class _Address:
+        street: str
+        tags: List[str]
+
+    class _EventTest(Event):
+        @dataclass
+        class Attributes:
+            name: str
+            addresses: List[_Address]
+            extra: Dict[str, Any]
+            point: Tuple[int, int]
+            scores: Set[int]
+
+        attributes: Attributes
+
+    class _EventTestEventMapper(EventMapper):
+        event_type = _EventTest
+        service_name = 'svc'
+        event_name = 'name'
+
+    event = _EventTest(
+        attributes=_EventTest.Attributes(
+            name='test',
+            addresses=[_Address(street='a', tags=['x', 'y'])],
+            extra={'nested': {'a': [1, 2]}, 'address': _Address(street='b', tags=[])},
+            point=(1, 2),
+            scores={1, 2},
+        )
+    )
+    event_mapper = _EventTestEventMapper()
+
+    for _ in range(2):
+        event_encoded = event_mapper.encode(event)
+
+        assert event_encoded == {
+            **asdict(event.meta),
+            'attributes': asdict(event.attributes),
+            'meta': {'message': 'svc.name'},
+        }
+        assert event_encoded['attributes']['scores'] is not event.attributes.scores
+        assert event_encoded['attributes']['addresses'][0]['tags'] is not event.attributes.addresses[0].tags
+
+        event_decoded = event_mapper.decode(event_encoded)
+
+        assert isinstance(event_decoded, _EventTest)
+        assert event_decoded.meta == event.meta
+        assert event_decoded.attributes == _EventTest.Attributes(**event_encoded['attributes'])
+
+
+def _create_config_event_mappers() -> Tuple[ConfigEventMappers, Type[Event], Type[Event]]:
+    class _EventTest1(Event):
+        @dataclass
+        class Attributes:
+            foo: str
+
+        attributes: Attributes
+
+    class _EventTest2(Event):
+        pass
+
+    class _TestEventMapper1(EventMapper):
+        event_type = _EventTest1
+        service_name = 'svc'
+        event_name = 'name1'
+
+    class _TestEventMapper2(EventMapper):
+        event_type = _EventTest2
+        service_name = 'svc'
+        event_name = 'name2'
+
+    return ConfigEventMappers(mappers=[_TestEventMapper1(), _TestEventMapper2()]), _EventTest1, _EventTest2
+
+
+def test_event_mappers_encode_and_decode_many() -> None:
+    sut, event_type1, event_type2 = _create_config_event_mappers()
+    events = [
+        event_type1(attributes=event_type1.Attributes(foo='a')),
+        event_type2(),
+        event_type1(event_type1.Attributes(foo='b')),
+    ]
+
+    encoded = sut.encode_many(events)
+
+    assert [data['meta']['message'] for data in encoded] == ['svc.name1', 'svc.name2', 'svc.name1']
+    assert sut.decode_many(encoded) == events
+    assert sut.find_by_type(event_type1).encode_many([events[0]]) == [encoded[0]]
+    assert sut.find_by_type(event_type1).decode_many([encoded[0]]) == [events[0]]
+
+
+async def test_event_mappers_encode_and_decode_streams() -> None:
+    sut, event_type1, event_type2 = _create_config_event_mappers()
+    events = [event_type1(attributes=event_type1.Attributes(foo='a')), event_type2()]
+
+    async def _events() -> AsyncIterator[Event]:
+        for event in events:
+            yield event
+
+    stream = BytesIO()
+    assert await sut.encode_stream(_events(), stream) == 2
+    assert stream.getvalue().count(b'\n') == 2
+
+    writer_mock = Mock()
+    writer_mock.drain = AsyncMock(return_value=None)
+    assert await sut.encode_stream(events, writer_mock, drain_every=1) == 2
+    assert writer_mock.drain.call_count == 3
+
+    stream.seek(0)
+    assert [event async for event in sut.decode_stream(stream)] == events
+
+    reader = StreamReader()
+    reader.feed_data(stream.getvalue() + b'\n')
+    reader.feed_eof()
+    assert [event async for event in sut.decode_stream(reader)] == events
+
+
+def test_event_meta_factory() -> None:
+    before = seconds_clock()
+    event = Event()
+
+    assert Id.validate(event.meta.id)
+    assert event.meta.type == 'event'
+    assert before <= event.meta.occurred_on <= seconds_clock()
+
+    set_event_meta_factory(EventMetaFactory(id_generator=MonotonicIdGenerator(), clock=milliseconds_clock))
+    try:
+        events = [Event() for _ in range(5000)]
+    finally:
+        set_event_meta_factory()
+
+    ids = [event.meta.id for event in events]
+    assert all(Id.validate(id_) for id_ in ids[:10])
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert events[0].meta.occurred_on > before * 999
+    assert Event().meta.occurred_on < before * 2
+    assert nanoseconds_clock() > milliseconds_clock() * 999
+
+
+def test_slotted_event_and_attributes() -> None:
+    @slotted
+    class _Item:
+        sku: str
+        quantity: int = 1
+
+    @slotted
+    class _EventTest(Event):
+        @slotted
+        class Attributes:
+            foo: str
+            items: List[_Item]
+
+        attributes: Attributes
+
+    class _EventTestEventMapper(EventMapper):
+        event_type = _EventTest
+        service_name = 'svc'
+        event_name = 'name'
+
+    event = _EventTest(attributes=_EventTest.Attributes(foo='test', items=[_Item(sku='a')]))
+    event_mapper = _EventTestEventMapper()
+
+    for instance in (event, event.attributes, event.attributes.items[0], event.meta):
+        assert not hasattr(instance, '__dict__')
+    assert _EventTest.__qualname__.endswith('_EventTest')
+    assert event.attributes.items[0].quantity == 1
+    assert deepcopy(event) == event
+    assert event_mapper.encode(event)['attributes'] == {'foo': 'test', 'items': [{'sku': 'a', 'quantity': 1}]}
+    assert event_mapper.decode(event_mapper.encode(event)).meta == event.meta
+    assert slotted(_EventTest) is _EventTest
+
+
+def test_slotted_keeps_zero_argument_super_and_event_weak_references() -> None:
+    @slotted
+    class _Base:
+        name: str
+
+        def describe(self) -> str:
+            return self.name
+
+    @slotted
+    class _Child(_Base):
+        size: int
+
+        def describe(self) -> str:
+            return f'{super().describe()}:{self.size}'
+
+        @property
+        def label(self) -> str:
+            return super().describe()
+
+    @slotted(weakref_slot=True)
+    class _Referenced:
+        pass
+
+    assert _Child(name='test', size=1).describe() == 'test:1'
+    assert _Child(name='test', size=1).label == 'test'
+    assert ref(Event())() is not None
+    assert ref(_Referenced())
+    with raises(TypeError):
+        ref(_Base(name='test'))
+
+
 def test_find_event_mapper_by_name() -> None:
     class _TestEventMapper(EventMapper):
         service_name = 'svc'
@@ -112,6 +340,44 @@ def test_config_event_mappers() -> None:
     assert isinstance(sut.all()[2], _TestEventMapper3)
 
 
+def test_config_event_mappers_finds_mappers_by_name_and_type() -> None:
+    class _EventTest(Event):
+        pass
+
+    class _ChildEventTest(_EventTest):
+        pass
+
+    class _OtherEventTest(Event):
+        pass
+
+    class _TestEventMapper(EventMapper):
+        event_type = _EventTest
+        service_name = 'svc'
+        event_name = 'name'
+
+    mapper = _TestEventMapper()
+    sut = ConfigEventMappers(mappers=[mapper])
+
+    assert sut.find_by_name('svc.name') is mapper
+    assert find_event_mapper_by_name(name='svc.name', mappers=sut) is mapper
+    assert sut.find_by_type(_EventTest()) is mapper
+    assert sut.find_by_type(_ChildEventTest) is mapper
+    assert find_event_mapper_by_type(msg=_ChildEventTest(), mappers=sut) is mapper
+    raises(EventMapperNotFoundError, lambda: sut.find_by_name('svc.other'))
+    raises(EventMapperNotFoundError, lambda: sut.find_by_type(_OtherEventTest()))
+    raises(EventMapperAlreadyRegisteredError, lambda: sut.add(mappers=_TestEventMapper()))
+
+    class _OtherEventMapper(EventMapper):
+        event_type = _OtherEventTest
+        service_name = 'svc'
+        event_name = 'other'
+
+    raises(EventMapperAlreadyRegisteredError, lambda: sut.add(mappers=[_OtherEventMapper(), _OtherEventMapper()]))
+    assert sut.all() == [mapper]
+    raises(EventMapperNotFoundError, lambda: sut.find_by_name('svc.other'))
+    raises(EventMapperNotFoundError, lambda: sut.find_by_type(_OtherEventTest()))
+
+
 async def test_event_publishers() -> None:
     event_publisher_mock1 = mock(EventPublisher, ['publish'])
     event_publisher_mock2 = mock(EventPublisher, ['publish'])
@@ -132,6 +398,138 @@ async def test_event_publishers() -> None:
     event_publisher_mock3.publish.assert_called_once()
 
 
+async def test_event_publishers_concurrently_isolates_failures_and_timeouts() -> None:
+    calls: List[str] = []
+
+    class _Publisher(EventPublisher):
+        async def publish(self, events: List[Event]) -> None:
+            calls.append('ok')
+
+    class _FailingPublisher(EventPublisher):
+        async def publish(self, events: List[Event]) -> None:
+            raise ValueError('test')
+
+    class _HungPublisher(EventPublisher):
+        async def publish(self, events: List[Event]) -> None:
+            await sleep(10)
+
+    ok_publisher, failing_publisher, hung_publisher = _Publisher(), _FailingPublisher(), _HungPublisher()
+    publisher = EventPublishers(
+        publishers=[failing_publisher, hung_publisher, ok_publisher], concurrent=True, timeout=0.01
+    )
+
+    results = await publisher.publish_with_results(events=[Event()])
+
+    assert [(pub, type(err)) for pub, err in results] == [
+        (failing_publisher, ValueError),
+        (hung_publisher, AsyncTimeoutError),
+        (ok_publisher, type(None)),
+    ]
+
+    with raises(EventNotPublishedError) as err:
+        await publisher.publish(events=[Event()])
+
+    assert loads(err.value.detail())['succeeded'] == ['_Publisher']
+    assert [failure['publisher'] for failure in loads(err.value.detail())['failed']] == [
+        '_FailingPublisher',
+        '_HungPublisher',
+    ]
+    assert calls == ['ok', 'ok']
+
+    sequential_results = await EventPublishers(publishers=[failing_publisher, ok_publisher]).publish_with_results([])
+    assert [err is None for _, err in sequential_results] == [False, True]
+
+    with raises(ValueError):
+        await EventPublishers(publishers=[failing_publisher, ok_publisher]).publish(events=[])
+    assert calls == ['ok', 'ok', 'ok']
+
+
+async def test_buffered_event_publisher_flushes_by_size_and_time() -> None:
+    batches: List[List[Event]] = []
+
+    class _Publisher(EventPublisher):
+        async def publish(self, events: List[Event]) -> None:
+            batches.append(events)
+
+    publisher = BufferedEventPublisher(publisher=_Publisher(), max_batch_size=3, max_linger=0.01)
+    events = [Event() for _ in range(5)]
+
+    await publisher.publish(events=events[:1])
+    await publisher.publish(events=events[1:2])
+    assert batches == []
+
+    await sleep(0.05)
+    assert batches == [events[:2]]
+
+    await publisher.publish(events=events[2:3])
+    await publisher.publish(events=events[3:])
+    assert batches == [events[:2], events[2:5]]
+
+    await publisher.publish(events=events[:1])
+    await publisher.close()
+    assert batches == [events[:2], events[2:5], events[:1]]
+
+    with raises(EventNotPublishedError):
+        await publisher.publish(events=[Event()])
+    raises(ValueError, lambda: BufferedEventPublisher(publisher=_Publisher(), max_batch_size=0))
+
+
+async def test_buffered_event_publisher_reports_errors() -> None:
+    errors: List[Tuple[List[Event], Exception]] = []
+    event_publisher_mock = mock(EventPublisher, ['publish'])
+    event_publisher_mock.publish.side_effect = [ValueError('test'), None]
+    publisher = BufferedEventPublisher(
+        publisher=event_publisher_mock, max_batch_size=2, max_linger=0.01, on_error=lambda *args: errors.append(args)
+    )
+    events = [Event(), Event()]
+
+    await publisher.publish(events=events[:1])
+    await sleep(0.05)
+
+    assert [(batch, str(err)) for batch, err in errors] == [(events[:1], 'test')]
+    assert [call.args[0] for call in event_publisher_mock.publish.call_args_list] == [events[:1], events[:1]]
+
+    event_publisher_mock.publish.side_effect = ValueError('test')
+    await publisher.publish(events=events[1:])
+    with raises(ValueError):
+        await publisher.close()
+    assert publisher._timer is None
+
+
+async def test_buffered_event_publisher_retries_failed_batches_without_raising() -> None:
+    event_publisher_mock = mock(EventPublisher, ['publish'])
+    event_publisher_mock.publish.side_effect = [ValueError('test'), None, None]
+    publisher = BufferedEventPublisher(
+        publisher=event_publisher_mock, max_batch_size=2, max_linger=0.01, on_error=lambda *_: None
+    )
+    events = [Event(), Event(), Event()]
+
+    await publisher.publish(events=events[:2])
+    await sleep(0.05)
+    await publisher.publish(events=events[2:])
+    await publisher.flush()
+
+    assert [call.args[0] for call in event_publisher_mock.publish.call_args_list] == [
+        events[:2],
+        events[:2],
+        events[2:],
+    ]
+
+
+async def test_buffered_event_publisher_keeps_failed_batches_when_flush_raises() -> None:
+    event_publisher_mock = mock(EventPublisher, ['publish'])
+    event_publisher_mock.publish.side_effect = [ValueError('test'), None]
+    publisher = BufferedEventPublisher(publisher=event_publisher_mock, max_batch_size=10, max_linger=60)
+    events = [Event(), Event()]
+
+    await publisher.publish(events=events)
+    with raises(ValueError):
+        await publisher.flush()
+    await publisher.flush()
+
+    assert [call.args[0] for call in event_publisher_mock.publish.call_args_list] == [events, events]
+
+
 async def test_simple_event_bus() -> None:
     event_handler_mock1 = Mock()
     event_handler_mock2 = Mock()
@@ -160,6 +558,112 @@ async def test_simple_event_bus() -> None:
     event_handler_mock3.handle.assert_called_once()
 
 
+async def test_queue_event_bus_delivers_events_in_background() -> None:
+    delivered: List[Event] = []
+    release = Event_()
+
+    async def _notify(events: List[Event]) -> None:
+        await release.wait()
+        delivered.extend(events)
+
+    event_bus_mock = mock(EventBus, ['notify'])
+    event_bus_mock.notify.side_effect = _notify
+    bus = QueueEventBus(event_bus=event_bus_mock, workers=2)
+    events = [Event(), Event(), Event()]
+
+    await bus.notify(events=events[:2])
+    await bus.notify(events=events[2:])
+
+    assert delivered == []
+    assert bus.stats()['enqueued'] == 3
+
+    release.set()
+    await bus.drain()
+
+    assert sorted(event.meta.id for event in delivered) == sorted(event.meta.id for event in events)
+    assert bus.stats()['delivered'] == 3
+    assert bus.stats()['depth'] == 0
+    assert bus.stats()['max_lag'] >= bus.stats()['last_lag'] > 0
+
+    await bus.close()
+
+    with raises(EventNotPublishedError):
+        await bus.notify(events=[Event()])
+
+
+async def test_queue_event_bus_overflow_policies() -> None:
+    event_bus_mock = mock(EventBus, ['notify'])
+    event_bus_mock.notify.return_value = None
+
+    bus = QueueEventBus(event_bus=event_bus_mock, max_size=1, overflow='drop')
+    await bus.notify(events=[Event()])
+    await bus.notify(events=[Event(), Event()])
+
+    assert bus.stats()['dropped'] == 2
+    await bus.close()
+    assert bus.stats()['delivered'] == 1
+
+    bus = QueueEventBus(event_bus=event_bus_mock, max_size=1, overflow='raise')
+    await bus.notify(events=[Event()])
+
+    with raises(EventNotPublishedError):
+        await bus.notify(events=[Event()])
+    await bus.close()
+
+    bus = QueueEventBus(event_bus=event_bus_mock, max_size=1, overflow='block')
+    await bus.notify(events=[Event()])
+    await bus.notify(events=[Event()])
+    await bus.close()
+    assert bus.stats()['delivered'] == 2
+
+    raises(ValueError, lambda: QueueEventBus(event_bus=event_bus_mock, workers=0))
+    raises(ValueError, lambda: QueueEventBus(event_bus=event_bus_mock, overflow='unknown'))
+
+
+async def test_queue_event_bus_reports_delivery_errors() -> None:
+    errors: List[Exception] = []
+    event_bus_mock = mock(EventBus, ['notify'])
+    event_bus_mock.notify.side_effect = ValueError('test')
+    bus = QueueEventBus(event_bus=event_bus_mock, on_error=lambda _, err: errors.append(err))
+
+    await bus.notify(events=[Event()])
+    await bus.close()
+
+    assert [str(err) for err in errors] == ['test']
+    assert bus.stats()['failed'] == 1
+
+
+async def test_queue_event_bus_survives_notify_raising_cancelled_error() -> None:
+    errors: List[BaseException] = []
+    event_bus_mock = mock(EventBus, ['notify'])
+    event_bus_mock.notify.side_effect = [CancelledError(), None]
+    bus = QueueEventBus(event_bus=event_bus_mock, on_error=lambda _, err: errors.append(err))
+
+    await bus.notify(events=[Event()])
+    await bus.notify(events=[Event()])
+    await wait_for(bus.close(), timeout=1)
+
+    assert [type(err) for err in errors] == [CancelledError]
+    assert (bus.stats()['depth'], bus.stats()['failed'], bus.stats()['delivered']) == (0, 1, 1)
+
+
+async def test_queue_event_bus_survives_on_error_raising() -> None:
+    def on_error(_: List[Event], err: BaseException) -> None:
+        raise RuntimeError('on_error')
+
+    event_bus_mock = mock(EventBus, ['notify'])
+    event_bus_mock.notify.side_effect = [ValueError('test'), None]
+    bus = QueueEventBus(event_bus=event_bus_mock, on_error=on_error, workers=1)
+
+    with patch('aioddd.events.getLogger') as get_logger_mock:
+        await bus.notify(events=[Event()])
+        await bus.notify(events=[Event()])
+        await wait_for(bus.close(), timeout=1)
+
+    assert get_logger_mock.return_value.error.call_count == 2
+    assert (bus.stats()['failed'], bus.stats()['delivered']) == (1, 1)
+
+
 async def test_internal_event_publisher() -> None:
     event_bus_mock = mock(EventBus, ['notify'])
 
@@ -175,3 +679,195 @@ async def test_internal_event_publisher() -> None:
     await publisher.publish(events=[event])
 
     event_bus_mock.notify.assert_called_once()
+
+
+async def test_simple_event_bus_resolves_handlers_by_event_type_hierarchy() -> None:
+    class _EventTest(Event):
+        pass
+
+    class _ChildEventTest(_EventTest):
+        pass
+
+    class _OtherEventTest(Event):
+        pass
+
+    parent_handler_mock = Mock()
+    parent_handler_mock.subscribed_to = lambda: [_EventTest]
+    parent_handler_mock.handle = AsyncMock(return_value=None)
+    other_handler_mock = Mock()
+    other_handler_mock.subscribed_to = lambda: [_OtherEventTest]
+    other_handler_mock.handle = AsyncMock(return_value=None)
+    child_handler_mock = Mock()
+    child_handler_mock.subscribed_to = lambda: [_ChildEventTest]
+    child_handler_mock.handle = AsyncMock(return_value=None)
+
+    bus = SimpleEventBus(handlers=[parent_handler_mock, other_handler_mock])
+    event = _ChildEventTest()
+
+    await bus.notify(events=[event])
+
+    parent_handler_mock.handle.assert_called_once_with([event])
+    other_handler_mock.handle.assert_not_called()
+
+    bus.add_handler(handler=child_handler_mock)
+    await bus.notify(events=[event])
+
+    assert parent_handler_mock.handle.call_count == 2
+    child_handler_mock.handle.assert_called_once_with([event])
+    other_handler_mock.handle.assert_not_called()
+
+
+async def test_simple_event_bus_with_concurrency_runs_handlers_concurrently() -> None:
+    class _EventTest(Event):
+        pass
+
+    calls: List[str] = []
+
+    async def _slow_handle(_: List[Event]) -> None:
+        calls.append('slow:start')
+        await sleep(0.01)
+        calls.append('slow:end')
+
+    async def _fast_handle(_: List[Event]) -> None:
+        calls.append('fast')
+
+    slow_handler_mock = Mock()
+    slow_handler_mock.subscribed_to = lambda: [_EventTest]
+    slow_handler_mock.handle = _slow_handle
+    fast_handler_mock = Mock()
+    fast_handler_mock.subscribed_to = lambda: [_EventTest]
+    fast_handler_mock.handle = _fast_handle
+
+    bus = SimpleEventBus(handlers=[slow_handler_mock, fast_handler_mock], concurrency=2)
+
+    await bus.notify(events=[_EventTest()])
+
+    assert calls == ['slow:start', 'fast', 'slow:end']
+
+
+async def test_simple_event_bus_with_concurrency_aggregates_handler_errors() -> None:
+    class _EventTest(Event):
+        pass
+
+    failing_handler_mock1 = Mock()
+    failing_handler_mock1.subscribed_to = lambda: [_EventTest]
+    failing_handler_mock1.handle = AsyncMock(side_effect=ValueError('first'))
+    handler_mock = Mock()
+    handler_mock.subscribed_to = lambda: [_EventTest]
+    handler_mock.handle = AsyncMock(return_value=None)
+    failing_handler_mock2 = Mock()
+    failing_handler_mock2.subscribed_to = lambda: [_EventTest]
+    failing_handler_mock2.handle = AsyncMock(side_effect=KeyError('second'))
+
+    for ordering in ('event', 'none'):
+        bus = SimpleEventBus(
+            handlers=[failing_handler_mock1, handler_mock, failing_handler_mock2], concurrency=1, ordering=ordering
+        )
+
+        with raises(EventNotHandledError) as err:
+            await bus.notify(events=[_EventTest(), _EventTest()])
+
+        assert [type(e) for e in err.value.errors()] == [ValueError, KeyError, ValueError, KeyError]
+    assert handler_mock.handle.call_count == 4
+
+
+async def test_simple_event_bus_with_concurrency_keeps_event_order() -> None:
+    class _EventTest(Event):
+        pass
+
+    calls: List[str] = []
+
+    async def _handle(events: List[Event]) -> None:
+        calls.append(f'start:{events[0].meta.id}')
+        await sleep(0)
+        calls.append(f'end:{events[0].meta.id}')
+
+    handler_mock = Mock()
+    handler_mock.subscribed_to = lambda: [_EventTest]
+    handler_mock.handle = _handle
+    event1, event2 = _EventTest(), _EventTest()
+
+    await SimpleEventBus(handlers=[handler_mock], concurrency=2, ordering='event').notify(events=[event1, event2])
+
+    assert calls == [
+        f'start:{event1.meta.id}',
+        f'end:{event1.meta.id}',
+        f'start:{event2.meta.id}',
+        f'end:{event2.meta.id}',
+    ]
+
+    calls.clear()
+    await SimpleEventBus(handlers=[handler_mock], concurrency=2, ordering='none').notify(events=[event1, event2])
+
+    assert calls == [
+        f'start:{event1.meta.id}',
+        f'start:{event2.meta.id}',
+        f'end:{event1.meta.id}',
+        f'end:{event2.meta.id}',
+    ]
+
+
+async def test_simple_event_bus_middlewares_wrap_notify() -> None:
+    class _EventTest(Event):
+        pass
+
+    calls: List[str] = []
+
+    async def outer(events: List[Event], next_: Next) -> None:
+        calls.append(f'outer:{len(events)}')
+        await next_(events)
+
+    async def inner(events: List[Event], next_: Next) -> None:
+        calls.append('inner')
+        await next_(events)
+
+    event_handler_mock = Mock()
+    event_handler_mock.subscribed_to = lambda: [_EventTest]
+    event_handler_mock.handle = AsyncMock(side_effect=lambda events: calls.append('handler'))
+    bus = SimpleEventBus(handlers=[event_handler_mock])
+    assert 'notify' not in vars(bus)
+
+    bus.add_middleware(outer)
+    bus.add_middleware([inner])
+    await bus.notify(events=[_EventTest()])
+
+    assert calls == ['outer:1', 'inner', 'handler']
+
+
+def test_simple_event_bus_rejects_invalid_options() -> None:
+    raises(ValueError, lambda: SimpleEventBus(handlers=[], concurrency=0))
+    raises(ValueError, lambda: SimpleEventBus(handlers=[], ordering='unknown'))
+
+
+async def test_simple_event_bus_batched_delivers_matching_events_per_handler() -> None:
+    class _EventTest1(Event):
+        pass
+
+    class _EventTest2(Event):
+        pass
+
+    class _BatchEventHandler(EventHandler):
+        def __init__(self, subscriptions: List[Type[Event]], max_batch_size: Optional[int] = None) -> None:
+            self._subscriptions = subscriptions
+            self._max_batch_size = max_batch_size
+            self.batches: List[List[Event]] = []
+
+        def subscribed_to(self) -> List[Type[Event]]:
+            return self._subscriptions
+
+        async def handle(self, events: List[Event]) -> None:
+            self.batches.append(events)
+
+        def max_batch_size(self) -> Optional[int]:
+            return self._max_batch_size
+
+    all_handler = _BatchEventHandler([_EventTest1, _EventTest2, Event])
+    limited_handler = _BatchEventHandler([_EventTest1], max_batch_size=2)
+    other_handler = _BatchEventHandler([_EventTest2])
+    events = [_EventTest1(), _EventTest2(), _EventTest1(), _EventTest1(), _EventTest1()]
+
+    await SimpleEventBus(handlers=[all_handler, limited_handler, other_handler], batched=True).notify(events=events)
+
+    assert all_handler.batches == [events]
+    assert limited_handler.batches == [[events[0], events[2]], [events[3], events[4]]]
+    assert other_handler.batches == [[events[1]]]
@@ -0,0 +1,77 @@
+from typing import List
+
+from pytest import raises
+
+from aioddd import (
+    Command,
+    Event,
+    HandlerMetrics,
+    Query,
+    SimpleCommandBus,
+    SimpleEventBus,
+    SimpleQueryBus,
+)
+from aioddd.testing import AsyncMock, Mock
+
+
+class _EventTest1(Event):
+    pass
+
+
+class _EventTest2(Event):
+    pass
+
+
+async def test_handler_metrics_records_handler_calls_of_every_bus() -> None:
+    metrics = HandlerMetrics(buckets=[10.0, 0.0])
+
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: Command
+    command_handler_mock.handle = AsyncMock(side_effect=[None, ValueError('test')])
+    command_bus = SimpleCommandBus([command_handler_mock], metrics=metrics)
+    await command_bus.dispatch(Command())
+    with raises(ValueError):
+        await command_bus.dispatch(Command())
+
+    query_handler_mock = Mock()
+    query_handler_mock.subscribed_to = lambda: Query
+    query_handler_mock.handle = AsyncMock(return_value='test')
+    assert await SimpleQueryBus([query_handler_mock], metrics=metrics).ask(Query()) == 'test'
+
+    class _EventHandler:
+        def subscribed_to(self) -> List[type]:
+            return [Event]
+
+        async def handle(self, events: List[Event]) -> None:
+            pass
+
+        def max_batch_size(self) -> None:
+            return None
+
+    event_bus = SimpleEventBus([_EventHandler()], batched=True, metrics=metrics)  # type: ignore
+    await event_bus.notify([_EventTest1(), _EventTest1()])
+    await event_bus.notify([_EventTest1(), _EventTest2()])
+
+    snapshot = metrics.snapshot()
+    assert snapshot['command']['Mock']['Command']['count'] == 2
+    assert snapshot['command']['Mock']['Command']['errors'] == 1
+    assert snapshot['command']['Mock']['Command']['buckets'] == {0.0: 0, 10.0: 2, float('inf'): 2}
+    assert snapshot['query']['Mock']['Query']['count'] == 1
+    assert snapshot['event']['_EventHandler']['_EventTest1']['count'] == 1
+    assert snapshot['event']['_EventHandler']['mixed']['count'] == 1
+
+    text = metrics.prometheus()
+    assert '# TYPE aioddd_handler_duration_seconds histogram\n' in text
+    assert 'aioddd_handler_calls_total{bus="command",handler="Mock",message="Command"} 2\n' in text
+    assert 'aioddd_handler_errors_total{bus="command",handler="Mock",message="Command"} 1\n' in text
+    assert 'aioddd_handler_duration_seconds_bucket{bus="query",handler="Mock",message="Query",le="+Inf"} 1\n' in text
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_buses_without_metrics_keep_their_handlers() -> None:
+    command_handler_mock = Mock()
+    command_handler_mock.subscribed_to = lambda: Command
+    bus = SimpleCommandBus([command_handler_mock])
+    assert bus._handlers[Command] is command_handler_mock
@@ -0,0 +1,74 @@
+from contextvars import ContextVar
+from threading import get_ident
+from typing import List, Type
+
+from pytest import raises
+
+from aioddd import (
+    Command,
+    Event,
+    Query,
+    SimpleCommandBus,
+    SimpleEventBus,
+    SimpleQueryBus,
+    ThreadOffload,
+    blocking,
+)
+from aioddd.testing import AsyncMock, Mock
+
+_request_id: ContextVar[str] = ContextVar('_request_id', default='')
+
+
+class _BlockingQueryHandler:
+    def __init__(self) -> None:
+        self.threads: List[int] = []
+
+    def subscribed_to(self) -> Type[Query]:
+        return Query
+
+    def handle(self, query: Query) -> str:
+        self.threads.append(get_ident())
+        return _request_id.get()
+
+
+async def test_thread_offload_runs_sync_handlers_in_threads_with_context() -> None:
+    offload = ThreadOffload(max_workers=2)
+    handler = _BlockingQueryHandler()
+    bus = SimpleQueryBus([handler], offload=offload)  # type: ignore
+
+    _request_id.set('test')
+    assert await bus.ask(Query()) == 'test'
+    assert handler.threads != [get_ident()]
+
+    async_handler_mock = Mock()
+    async_handler_mock.subscribed_to = lambda: Command
+    async_handler_mock.handle = AsyncMock(return_value=None)
+    command_bus = SimpleCommandBus([async_handler_mock], offload=offload)
+    assert command_bus._handlers[Command] is async_handler_mock
+
+    offload.shutdown()
+    raises(ValueError, lambda: ThreadOffload(max_workers=0))
+
+
+async def test_thread_offload_runs_marked_handlers_only_without_detection() -> None:
+    threads: List[int] = []
+
+    class _EventHandler:
+        def subscribed_to(self) -> List[Type[Event]]:
+            return [Event]
+
+        @blocking
+        def handle(self, events: List[Event]) -> None:
+            threads.append(get_ident())
+            raise ValueError('test')
+
+    offload = ThreadOffload(detect=False)
+    unmarked_handler_mock = Mock()
+    unmarked_handler_mock.handle = lambda events: None
+    assert offload.wrap(unmarked_handler_mock) is unmarked_handler_mock
+
+    bus = SimpleEventBus([_EventHandler()], offload=offload)  # type: ignore
+    with raises(ValueError):
+        await bus.notify([Event()])
+    assert threads and threads[0] != get_ident()
+    offload.shutdown()
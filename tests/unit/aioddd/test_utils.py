@@ -0,0 +1,43 @@
+from asyncio import CancelledError, create_task, sleep
+
+from pytest import mark, raises
+
+from aioddd.testing import patch
+from aioddd.utils import _settle
+
+
+async def _raise(err: BaseException) -> None:
+    raise err
+
+
+async def _return(value: str) -> str:
+    return value
+
+
+@mark.parametrize('version', [(3, 10), (3, 11)])
+async def test_settle_returns_results_and_errors(version: tuple) -> None:
+    with patch('aioddd.utils.version_info', version):
+        assert await _settle(_return('ok')) == ('ok', None)
+        _, err = await _settle(_raise(ValueError('test')))
+        assert isinstance(err, ValueError)
+        _, err = await _settle(_raise(CancelledError()))
+        assert isinstance(err, CancelledError)
+
+
+@mark.parametrize('version', [(3, 10), (3, 11)])
+async def test_settle_reraises_exit_signals(version: tuple) -> None:
+    with patch('aioddd.utils.version_info', version):
+        with raises(SystemExit):
+            await _settle(_raise(SystemExit(2)))
+        with raises(KeyboardInterrupt):
+            await _settle(_raise(KeyboardInterrupt()))
+
+
+@mark.parametrize('version', [(3, 10), (3, 11)])
+async def test_settle_propagates_cancellation_of_the_current_task(version: tuple) -> None:
+    with patch('aioddd.utils.version_info', version):
+        task = create_task(_settle(sleep(1)))
+        await sleep(0)
+        task.cancel()
+        with raises(CancelledError):
+            await task